@@ -13,6 +13,7 @@ __version__ = "1.4.4"
 __author__ = "Chris Goetz"
 __email__ = "goetzcj@gmail.com"
 
+from .config import ServerConfig, load_config
 from .server import NinjaRMMServer
 
-__all__ = ["NinjaRMMServer"]
+__all__ = ["NinjaRMMServer", "ServerConfig", "load_config"]
@@ -12,9 +12,8 @@ This is particularly useful for:
 - Development and testing
 """
 
-import asyncio
 import sys
-from .server import main
+from .server import main, run_event_loop
 
 def run_main():
     """
@@ -24,7 +23,7 @@ def run_main():
     proper cleanup when the server is terminated.
     """
     try:
-        asyncio.run(main())
+        run_event_loop(main())
     except KeyboardInterrupt:
         print("\nServer stopped by user", file=sys.stderr)
         sys.exit(0)
@@ -1,13 +1,19 @@
 """Authentication manager for NinjaRMM MCP Server."""
 
+import asyncio
 import logging
-from typing import Optional, Dict, Any
-from ..models.auth import AuthStatus, TokenInfo
+import os
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+from ..models.auth import AuthStatus, TokenInfo, is_ticket_operation
 from .tokens import TokenManager
 from .oauth import OAuth2Client
 
 logger = logging.getLogger(__name__)
 
+# Seconds before expiry at which a token is considered stale and refreshed in the background
+STALE_BUFFER_SECONDS = 300
+
 
 class AuthenticationManager:
     """Manages authentication for NinjaRMM API with hybrid OAuth2 flows."""
@@ -46,6 +52,21 @@ class AuthenticationManager:
             client_scopes=client_scopes,
             user_scopes=user_scopes
         )
+
+        # In-flight authentication flows, keyed by flow name, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Last valid access token per operation category ("ticket"/"other") and its
+        # time.time() deadline, so authenticate() can skip status recomputation. Wall
+        # clock on purpose: time.monotonic() stops while the machine sleeps
+        self._cached_best: Dict[str, Tuple[str, float]] = {}
+
+        # Stale tokens are still served while a refresh runs in the background
+        self._stale_buffer = STALE_BUFFER_SECONDS
+        self._bg_refresh_task: Optional[asyncio.Task] = None
+
+        # TokenManager version the auth status was last built from
+        self._status_version = -1
     
     async def initialize(self) -> None:
         """Initialize the authentication manager."""
@@ -58,43 +79,93 @@ class AuthenticationManager:
     
     async def _check_injected_tokens(self) -> None:
         """Check for tokens injected by credential management system."""
-        import os
-
-        # Check for client credentials tokens
-        client_access_token = os.getenv("NINJARMM_CLIENT_ACCESS_TOKEN")
-        client_refresh_token = os.getenv("NINJARMM_CLIENT_REFRESH_TOKEN")
-        client_expires_in = os.getenv("NINJARMM_CLIENT_EXPIRES_IN")
-
-        if client_access_token:
-            expires_in = int(client_expires_in) if client_expires_in else 3600
-            await self.inject_client_token(
-                access_token=client_access_token,
-                refresh_token=client_refresh_token,
-                expires_in=expires_in,
-                scope=self.client_scopes
-            )
-            logger.info("Injected client credentials token from environment")
-
-        # Check for user authorization tokens
-        user_access_token = os.getenv("NINJARMM_USER_ACCESS_TOKEN")
-        user_refresh_token = os.getenv("NINJARMM_USER_REFRESH_TOKEN")
-        user_expires_in = os.getenv("NINJARMM_USER_EXPIRES_IN")
-
-        if user_access_token:
-            expires_in = int(user_expires_in) if user_expires_in else 3600
-            await self.inject_user_token(
-                access_token=user_access_token,
-                refresh_token=user_refresh_token,
-                expires_in=expires_in,
-                scope=self.user_scopes
-            )
-            logger.info("Injected user authorization token from environment")
+        env = os.environ
+        if "NINJARMM_CLIENT_ACCESS_TOKEN" not in env and "NINJARMM_USER_ACCESS_TOKEN" not in env:
+            return
+
+        tokens_data: Dict[str, Dict[str, Any]] = {}
+        for token_type, prefix, scope in (
+            ("client", "NINJARMM_CLIENT", self.client_scopes),
+            ("user", "NINJARMM_USER", self.user_scopes),
+        ):
+            access_token = env.get(f"{prefix}_ACCESS_TOKEN")
+            if access_token:
+                tokens_data[token_type] = {
+                    "access_token": access_token,
+                    "refresh_token": env.get(f"{prefix}_REFRESH_TOKEN"),
+                    "expires_in": int(env.get(f"{prefix}_EXPIRES_IN") or 3600),
+                    "scope": scope
+                }
+
+        if tokens_data:
+            await self.inject_tokens_from_dict(tokens_data)
+            logger.info(f"Injected {' and '.join(tokens_data)} token(s) from environment")
+
+    async def _single_flight(self, key: str, coro_factory: Callable[[], Awaitable[None]]) -> None:
+        """
+        Run an authentication flow at most once at a time.
+
+        Concurrent callers asking for the same flow await the future of the
+        flow that is already running instead of starting their own OAuth roundtrip.
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(coro_factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(future)
+
+    def _remember_token(self, category: str, token: TokenInfo) -> str:
+        """Cache a fresh token for the authenticate() fast path and return its access token."""
+        remaining = token.seconds_until_expiry()
+        if remaining is not None and remaining > self._stale_buffer:
+            self._cached_best[category] = (token.access_token, time.time() + remaining - self._stale_buffer)
+        return token.access_token
+
+    def _is_fresh(self, token: TokenInfo) -> bool:
+        """Check if a token is valid and not yet inside the stale window."""
+        remaining = token.seconds_until_expiry()
+        return token.is_valid() and remaining is not None and remaining > self._stale_buffer
+
+    def _refresh_if_stale(self, token: TokenInfo) -> None:
+        """Start a background refresh when a still-valid token is close to expiry."""
+        if not self.has_machine_credentials or not self.oauth_client:
+            return
+        if token.expires_at is None or self._is_fresh(token):
+            return
+
+        if token is self.auth_status.tokens["user"]:
+            if not token.refresh_token:
+                # Re-authorizing a user needs a browser, never do that in the background
+                return
+            key, flow = "user_refresh", self._refresh_user_token
+        else:
+            key, flow = "client", self._authenticate_client_credentials
+
+        if key not in self._inflight:
+            self._bg_refresh_task = asyncio.ensure_future(self._background_refresh(key, flow))
+
+    async def _background_refresh(self, key: str, flow: Callable[[], Awaitable[None]]) -> None:
+        """Run a token refresh without blocking the caller that triggered it."""
+        try:
+            await self._single_flight(key, flow)
+        except Exception as e:
+            logger.warning(f"Background token refresh failed: {e}")
+
+    def _invalidate_token_cache(self) -> None:
+        """Drop fast-path token cache entries after any token change."""
+        self._cached_best.clear()
 
     async def _update_auth_status(self) -> None:
-        """Update authentication status with current tokens."""
+        """Update authentication status with current tokens, if they changed."""
+        version = self.token_manager.version
+        if version == self._status_version:
+            return
+
         tokens = self.token_manager.get_all_tokens()
         self.auth_status.tokens = tokens
         self.auth_status.update_capabilities()
+        self._status_version = version
     
     async def authenticate(self, operation: Optional[str] = None) -> str:
         """
@@ -109,60 +180,62 @@ class AuthenticationManager:
         Raises:
             Exception: If authentication fails
         """
+        is_ticket = is_ticket_operation(operation)
+        category = "ticket" if is_ticket else "other"
+        cached = self._cached_best.get(category)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
         await self._update_auth_status()
+        auth_status = self.auth_status
         
         # Check if we have a valid token for this operation
-        token = self.auth_status.get_best_token(operation)
+        token = auth_status.get_best_token(operation)
         if token and token.is_valid():
-            return token.access_token
+            self._refresh_if_stale(token)
+            return self._remember_token(category, token)
+        
+        if not self.has_machine_credentials:
+            # Only injected tokens are usable and none is valid; without an OAuth
+            # client there is nothing to refresh or authenticate with
+            raise Exception("No valid authentication available. Machine credentials not configured and no user tokens injected.")
         
         # Try to refresh user token if available
-        user_token = self.auth_status.tokens["user"]
+        user_token = auth_status.tokens["user"]
         if user_token.refresh_token and not user_token.is_valid():
             try:
-                await self._refresh_user_token()
+                await self._single_flight("user_refresh", self._refresh_user_token)
                 await self._update_auth_status()
-                token = self.auth_status.get_best_token(operation)
+                token = auth_status.get_best_token(operation)
                 if token and token.is_valid():
-                    return token.access_token
+                    return self._remember_token(category, token)
             except Exception as e:
                 logger.warning(f"Failed to refresh user token: {e}")
         
         # Determine which authentication flow to use
-        if not self.has_machine_credentials:
-            # No machine credentials available - must use injected user tokens
-            if not self.auth_status.tokens["user"].is_valid():
-                raise Exception("No valid authentication available. Machine credentials not configured and no user tokens injected.")
-            # Skip authentication flow since we rely on injected tokens
-            return self.auth_status.tokens["user"].access_token
-        elif self.auth_mode == "client" or (
-            self.auth_mode == "hybrid" and
-            operation and "ticket" not in operation.lower()
-        ):
-            # Use client credentials for non-ticket operations
-            await self._authenticate_client_credentials()
-        elif self.auth_mode == "user" or (
-            self.auth_mode == "hybrid" and
-            operation and "ticket" in operation.lower()
-        ):
+        if self.auth_mode == "user" or (self.auth_mode == "hybrid" and is_ticket):
             # Use user authorization for ticket operations
-            await self._authenticate_user_authorization()
+            await self._single_flight("user", self._authenticate_user_authorization)
         else:
-            # Default to client credentials
-            await self._authenticate_client_credentials()
+            # Use client credentials for non-ticket operations and by default
+            await self._single_flight("client", self._authenticate_client_credentials)
         
         await self._update_auth_status()
-        token = self.auth_status.get_best_token(operation)
+        token = auth_status.get_best_token(operation)
         if not token or not token.is_valid():
             raise Exception("Authentication failed - no valid token available")
         
-        return token.access_token
+        return self._remember_token(category, token)
 
     async def _authenticate_client_credentials(self) -> None:
         """Authenticate using client credentials flow."""
         if not self.has_machine_credentials or not self.oauth_client:
             raise Exception("Client credentials authentication not available - no machine credentials configured")
 
+        if self._is_fresh(self.token_manager.get_token("client")):
+            # Another caller obtained a fresh token while this one was waiting
+            return
+
         try:
             logger.info("Authenticating with client credentials")
             token_data = await self.oauth_client.get_client_credentials_token(self.client_scopes)
@@ -173,6 +246,7 @@ class AuthenticationManager:
                 token_data["expires_in"],
                 scope=token_data.get("scope")
             )
+            self._invalidate_token_cache()
 
             logger.info("Client credentials authentication successful")
 
@@ -185,6 +259,10 @@ class AuthenticationManager:
         if not self.has_machine_credentials or not self.oauth_client:
             raise Exception("User authorization flow not available - no machine credentials configured for OAuth flow")
 
+        if self._is_fresh(self.token_manager.get_token("user")):
+            # Another caller obtained a fresh token while this one was waiting
+            return
+
         try:
             logger.info("Starting user authorization flow")
             token_data = await self.oauth_client.get_user_authorization_token(self.user_scopes)
@@ -196,6 +274,7 @@ class AuthenticationManager:
                 refresh_token=token_data.get("refresh_token"),
                 scope=token_data.get("scope")
             )
+            self._invalidate_token_cache()
 
             logger.info("User authorization authentication successful")
 
@@ -209,6 +288,9 @@ class AuthenticationManager:
             raise Exception("Token refresh not available - no machine credentials configured for OAuth flow")
 
         user_token = self.token_manager.get_token("user")
+        if self._is_fresh(user_token):
+            # Another caller refreshed the token while this one was waiting
+            return
         if not user_token.refresh_token:
             raise Exception("No refresh token available")
 
@@ -223,6 +305,7 @@ class AuthenticationManager:
                 refresh_token=token_data.get("refresh_token", user_token.refresh_token),
                 scope=token_data.get("scope")
             )
+            self._invalidate_token_cache()
 
             logger.info("User token refresh successful")
 
@@ -233,6 +316,8 @@ class AuthenticationManager:
     async def get_auth_status(self) -> AuthStatus:
         """Get current authentication status."""
         await self._update_auth_status()
+        # Token validity depends on the clock, not only on token changes
+        self.auth_status.update_capabilities()
         return self.auth_status
 
     async def inject_client_token(self, access_token: str, refresh_token: Optional[str] = None,
@@ -253,6 +338,7 @@ class AuthenticationManager:
             expires_in=expires_in,
             scope=scope or self.client_scopes
         )
+        self._invalidate_token_cache()
         logger.info("Injected client credentials token")
 
     async def inject_user_token(self, access_token: str, refresh_token: Optional[str] = None,
@@ -273,6 +359,7 @@ class AuthenticationManager:
             expires_in=expires_in,
             scope=scope or self.user_scopes
         )
+        self._invalidate_token_cache()
         logger.info("Injected user authorization token")
 
     async def inject_tokens_from_dict(self, tokens_data: Dict[str, Dict[str, Any]]) -> None:
@@ -296,28 +383,34 @@ class AuthenticationManager:
                     }
                 }
         """
+        injections = []
+
         if "client" in tokens_data:
             client_data = tokens_data["client"]
-            await self.inject_client_token(
+            injections.append(self.inject_client_token(
                 access_token=client_data["access_token"],
                 refresh_token=client_data.get("refresh_token"),
                 expires_in=client_data.get("expires_in", 3600),
                 scope=client_data.get("scope")
-            )
+            ))
 
         if "user" in tokens_data:
             user_data = tokens_data["user"]
-            await self.inject_user_token(
+            injections.append(self.inject_user_token(
                 access_token=user_data["access_token"],
                 refresh_token=user_data.get("refresh_token"),
                 expires_in=user_data.get("expires_in", 3600),
                 scope=user_data.get("scope")
-            )
+            ))
+
+        # Both tokens land in the same persisted write
+        await asyncio.gather(*injections)
 
     async def reauthorize_user(self) -> None:
         """Force user re-authorization."""
         await self.token_manager.clear_token("user")
-        await self._authenticate_user_authorization()
+        self._invalidate_token_cache()
+        await self._single_flight("user", self._authenticate_user_authorization)
 
     async def clear_tokens(self, token_type: str = "all") -> None:
         """Clear stored tokens."""
@@ -325,5 +418,20 @@ class AuthenticationManager:
             await self.token_manager.clear_all_tokens()
         else:
             await self.token_manager.clear_token(token_type)
+        self._invalidate_token_cache()
 
         await self._update_auth_status()
+
+    async def close(self) -> None:
+        """Cancel background work, finish pending token writes and close the OAuth2 client."""
+        if self._bg_refresh_task and not self._bg_refresh_task.done():
+            self._bg_refresh_task.cancel()
+            try:
+                await self._bg_refresh_task
+            except asyncio.CancelledError:
+                pass
+        for future in list(self._inflight.values()):
+            future.cancel()
+        await self.token_manager.flush()
+        if self.oauth_client:
+            await self.oauth_client.aclose()
@@ -8,29 +8,12 @@ import urllib.parse
 from typing import Optional, Dict, Any
 import logging
 import webbrowser
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import threading
 import httpx
 
 logger = logging.getLogger(__name__)
 
 
-class OAuth2CallbackHandler(BaseHTTPRequestHandler):
-    """HTTP handler for OAuth2 callback."""
-    
-    def do_GET(self):
-        """Handle GET request for OAuth2 callback."""
-        # Parse the callback URL
-        parsed_url = urllib.parse.urlparse(self.path)
-        query_params = urllib.parse.parse_qs(parsed_url.query)
-        
-        # Store the authorization code
-        if 'code' in query_params:
-            self.server.auth_code = query_params['code'][0]
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(b"""
+_SUCCESS_PAGE = b"""
             <html>
             <body>
             <h1>Authorization Successful!</h1>
@@ -38,25 +21,64 @@ class OAuth2CallbackHandler(BaseHTTPRequestHandler):
             <script>window.close();</script>
             </body>
             </html>
-            """)
-        else:
-            error = query_params.get('error', ['Unknown error'])[0]
-            self.server.auth_error = error
-            self.send_response(400)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(f"""
+            """
+
+_FAILURE_PAGE = """
             <html>
             <body>
             <h1>Authorization Failed</h1>
             <p>Error: {error}</p>
             </body>
             </html>
-            """.encode())
+            """
+
+
+class OAuth2CallbackListener:
+    """One-shot asyncio listener for the OAuth2 redirect callback."""
+    
+    def __init__(self, callback_path: str = "/callback"):
+        self.callback_path = callback_path
+        self.result: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
     
-    def log_message(self, format, *args):
-        """Suppress log messages."""
-        pass
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle one HTTP connection to the callback port."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            # Drain the request headers; the callback carries everything in the query string
+            while (await asyncio.wait_for(reader.readline(), timeout=10)) not in (b"\r\n", b"\n", b""):
+                pass
+            
+            parts = request_line.decode("latin-1").split()
+            parsed_url = urllib.parse.urlparse(parts[1] if len(parts) > 1 else "")
+            
+            if parsed_url.path != self.callback_path or self.result.done():
+                # Stray requests (favicon, reloads) don't end the flow
+                self._respond(writer, 404, b"Not Found")
+            else:
+                query_params = urllib.parse.parse_qs(parsed_url.query)
+                if "code" in query_params:
+                    self.result.set_result(query_params["code"][0])
+                    self._respond(writer, 200, _SUCCESS_PAGE)
+                else:
+                    error = query_params.get("error", ["Unknown error"])[0]
+                    self.result.set_exception(Exception(f"Authorization failed: {error}"))
+                    self._respond(writer, 400, _FAILURE_PAGE.format(error=error).encode())
+            
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+    
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, body: bytes) -> None:
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: text/html\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
 
 
 class OAuth2Client:
@@ -68,14 +90,24 @@ class OAuth2Client:
         self.client_secret = client_secret
         self.redirect_port = redirect_port
         self.redirect_uri = f"http://localhost:{redirect_port}/callback"
+        # Static part of the authorization URL; only scope, state and challenge vary per flow
+        self._auth_url_prefix = f"{self.base_url}/oauth/authorize?" + urllib.parse.urlencode({
+            "response_type": "code",
+            "client_id": self.client_id,
+            "redirect_uri": self.redirect_uri,
+            "code_challenge_method": "S256"
+        })
+        # Token endpoint calls (initial grants and every refresh) reuse one pooled connection
+        self._http = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0))
     
     def _generate_pkce_challenge(self) -> tuple[str, str]:
         """Generate PKCE code verifier and challenge."""
-        code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=')
+        verifier_bytes = base64.urlsafe_b64encode(secrets.token_bytes(32)).rstrip(b'=')
+        # hashlib's SHA-256 is OpenSSL-backed and already uses CPU SHA extensions
         code_challenge = base64.urlsafe_b64encode(
-            hashlib.sha256(code_verifier.encode('utf-8')).digest()
-        ).decode('utf-8').rstrip('=')
-        return code_verifier, code_challenge
+            hashlib.sha256(verifier_bytes).digest()
+        ).rstrip(b'=').decode('ascii')
+        return verifier_bytes.decode('ascii'), code_challenge
     
     async def get_client_credentials_token(self, scope: str) -> Dict[str, Any]:
         """Get token using client credentials flow."""
@@ -92,10 +124,9 @@ class OAuth2Client:
             "Content-Type": "application/x-www-form-urlencoded"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self._http.post(token_url, data=data, headers=headers)
+        response.raise_for_status()
+        return response.json()
     
     async def get_user_authorization_token(self, scope: str) -> Dict[str, Any]:
         """Get token using user authorization flow with PKCE."""
@@ -103,31 +134,19 @@ class OAuth2Client:
         code_verifier, code_challenge = self._generate_pkce_challenge()
         state = secrets.token_urlsafe(32)
         
-        # Build authorization URL
-        auth_params = {
-            "response_type": "code",
-            "client_id": self.client_id,
-            "redirect_uri": self.redirect_uri,
-            "scope": scope,
-            "state": state,
-            "code_challenge": code_challenge,
-            "code_challenge_method": "S256"
-        }
-        
-        auth_url = f"{self.base_url}/oauth/authorize?" + urllib.parse.urlencode(auth_params)
+        # Build authorization URL (state and challenge are already URL-safe base64)
+        auth_url = (
+            f"{self._auth_url_prefix}&scope={urllib.parse.quote_plus(scope)}"
+            f"&state={state}&code_challenge={code_challenge}"
+        )
         
         logger.info(f"Starting OAuth2 authorization flow on port {self.redirect_port}")
         logger.info(f"Authorization URL: {auth_url}")
         
-        # Start local server for callback
-        server = HTTPServer(('localhost', self.redirect_port), OAuth2CallbackHandler)
-        server.auth_code = None
-        server.auth_error = None
-        
-        # Start server in a separate thread
-        server_thread = threading.Thread(target=server.serve_forever)
-        server_thread.daemon = True
-        server_thread.start()
+        # Listen for the callback on the event loop itself; the listener resolves a
+        # future with the authorization code and the port closes as soon as we're done
+        listener = OAuth2CallbackListener()
+        server = await asyncio.start_server(listener.handle, "localhost", self.redirect_port)
         
         try:
             # Open browser for authorization
@@ -135,23 +154,17 @@ class OAuth2Client:
             
             # Wait for callback
             timeout = 300  # 5 minutes
-            for _ in range(timeout):
-                if server.auth_code or server.auth_error:
-                    break
-                await asyncio.sleep(1)
-            
-            if server.auth_error:
-                raise Exception(f"Authorization failed: {server.auth_error}")
-            
-            if not server.auth_code:
+            try:
+                auth_code = await asyncio.wait_for(asyncio.shield(listener.result), timeout=timeout)
+            except asyncio.TimeoutError:
                 raise Exception("Authorization timed out")
             
             # Exchange code for token
-            return await self._exchange_code_for_token(server.auth_code, code_verifier)
+            return await self._exchange_code_for_token(auth_code, code_verifier)
             
         finally:
-            server.shutdown()
-            server_thread.join(timeout=1)
+            server.close()
+            await server.wait_closed()
     
     async def _exchange_code_for_token(self, auth_code: str, code_verifier: str) -> Dict[str, Any]:
         """Exchange authorization code for access token."""
@@ -170,10 +183,9 @@ class OAuth2Client:
             "Content-Type": "application/x-www-form-urlencoded"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self._http.post(token_url, data=data, headers=headers)
+        response.raise_for_status()
+        return response.json()
     
     async def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """Refresh an access token using refresh token."""
@@ -190,7 +202,10 @@ class OAuth2Client:
             "Content-Type": "application/x-www-form-urlencoded"
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, data=data, headers=headers)
-            response.raise_for_status()
-            return response.json()
+        response = await self._http.post(token_url, data=data, headers=headers)
+        response.raise_for_status()
+        return response.json()
+    
+    async def aclose(self) -> None:
+        """Close the token endpoint connection pool."""
+        await self._http.aclose()
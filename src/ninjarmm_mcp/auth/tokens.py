@@ -1,13 +1,14 @@
 """Token management for NinjaRMM authentication."""
 
-import json
-import aiofiles
-from datetime import datetime, timedelta
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
 import logging
 
 from ..models.auth import TokenInfo
+from ..utils.serialization import dump_bytes, loads
 
 logger = logging.getLogger(__name__)
 
@@ -17,30 +18,62 @@ class TokenManager:
     
     def __init__(self, storage_path: str = "./tokens.json"):
         self.storage_path = Path(storage_path)
+        self._tmp_path = self.storage_path.with_name(self.storage_path.name + ".tmp")
+        # Copy-on-write: changes rebind a new dict, so readers always see a consistent
+        # snapshot and in-flight saves never observe a half-applied update
         self._tokens: Dict[str, TokenInfo] = {
             "client": TokenInfo(),
             "user": TokenInfo()
         }
+        # Bumped on every token change so consumers can cheaply detect updates
+        self._version = 0
+        # Single writer task that flushes changes to disk; _dirty marks unsaved changes
+        self._writer: Optional[asyncio.Future] = None
+        self._dirty = False
     
-    async def load_tokens(self) -> None:
-        """Load tokens from storage."""
+    @property
+    def version(self) -> int:
+        """Counter incremented whenever the stored tokens change."""
+        return self._version
+    
+    def _read_sync(self) -> Optional[bytes]:
+        """Read the token file, or return None if it does not exist."""
         if not self.storage_path.exists():
-            logger.info("No token storage file found, starting with empty tokens")
-            return
+            return None
+        return self.storage_path.read_bytes()
+    
+    def _write_sync(self, content: bytes) -> None:
+        """Atomically replace the token file with new content."""
+        # Ensure directory exists
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Write to a temporary file and rename it over the old one, so a crash
+        # mid-write never leaves a truncated token store behind
+        self._tmp_path.write_bytes(content)
+        os.replace(self._tmp_path, self.storage_path)
+    
+    async def load_tokens(self) -> None:
+        """Load tokens from storage."""
         try:
-            async with aiofiles.open(self.storage_path, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
+            # All file system work happens in one worker thread hop, off the event loop
+            content = await asyncio.get_running_loop().run_in_executor(None, self._read_sync)
+            if content is None:
+                logger.info("No token storage file found, starting with empty tokens")
+                return
+            
+            data = loads(content)
             
+            tokens = dict(self._tokens)
             for token_type, token_data in data.items():
-                if token_type in self._tokens:
+                if token_type in tokens:
                     # Convert expires_at string back to datetime
                     if token_data.get("expires_at"):
                         token_data["expires_at"] = datetime.fromisoformat(token_data["expires_at"])
                     
-                    self._tokens[token_type] = TokenInfo(**token_data)
+                    tokens[token_type] = TokenInfo(**token_data)
             
+            self._tokens = tokens
+            self._version += 1
             logger.info("Loaded tokens from storage")
             
         except Exception as e:
@@ -58,17 +91,34 @@ class TokenManager:
                     token_dict["expires_at"] = token_dict["expires_at"].isoformat()
                 data[token_type] = token_dict
             
-            # Ensure directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            async with aiofiles.open(self.storage_path, 'w') as f:
-                await f.write(json.dumps(data, indent=2))
+            content = dump_bytes(data)
+            await asyncio.get_running_loop().run_in_executor(None, self._write_sync, content)
             
             logger.info("Saved tokens to storage")
             
         except Exception as e:
             logger.error(f"Failed to save tokens: {e}")
     
+    async def _schedule_save(self) -> None:
+        """Persist tokens through the single writer task and wait until this change is on disk."""
+        self._dirty = True
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._flush())
+        await asyncio.shield(self._writer)
+    
+    async def _flush(self) -> None:
+        """Write pending changes until none are left; only one flush ever runs at a time."""
+        while self._dirty:
+            # Let concurrent token updates land so one write covers the whole burst
+            await asyncio.sleep(0)
+            self._dirty = False
+            await self.save_tokens()
+    
+    async def flush(self) -> None:
+        """Wait for any pending token write to reach disk."""
+        if self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
+    
     def get_token(self, token_type: str) -> TokenInfo:
         """Get a token by type."""
         return self._tokens.get(token_type, TokenInfo())
@@ -76,23 +126,25 @@ class TokenManager:
     async def set_token(self, token_type: str, access_token: str, expires_in: int, 
                        refresh_token: Optional[str] = None, scope: Optional[str] = None) -> None:
         """Set a token with expiration."""
-        expires_at = datetime.now() + timedelta(seconds=int(expires_in * 0.9))  # 90% of actual expiry
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=int(expires_in * 0.9))  # 90% of actual expiry
         
-        self._tokens[token_type] = TokenInfo(
+        self._tokens = {**self._tokens, token_type: TokenInfo(
             access_token=access_token,
             refresh_token=refresh_token,
             expires_at=expires_at,
             scope=scope,
             valid=True
-        )
+        )}
+        self._version += 1
         
-        await self.save_tokens()
+        await self._schedule_save()
         logger.info(f"Set {token_type} token, expires at {expires_at}")
     
     async def clear_token(self, token_type: str) -> None:
         """Clear a specific token."""
-        self._tokens[token_type] = TokenInfo()
-        await self.save_tokens()
+        self._tokens = {**self._tokens, token_type: TokenInfo()}
+        self._version += 1
+        await self._schedule_save()
         logger.info(f"Cleared {token_type} token")
     
     async def clear_all_tokens(self) -> None:
@@ -101,7 +153,8 @@ class TokenManager:
             "client": TokenInfo(),
             "user": TokenInfo()
         }
-        await self.save_tokens()
+        self._version += 1
+        await self._schedule_save()
         logger.info("Cleared all tokens")
     
     def get_all_tokens(self) -> Dict[str, TokenInfo]:
@@ -1,15 +1,46 @@
 """NinjaRMM API client with authentication and error handling."""
 
+import asyncio
+import copy
 import json
 import logging
-from typing import Optional, Dict, Any, Union, List
+import random
+import time
+from typing import Optional, Dict, Any, Tuple, Union, List
 import httpx
 from mcp.types import ErrorData
 
 from .auth import AuthenticationManager
+from .utils.serialization import dump_bytes, loads, pretty_json
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401 - presence enables HTTP/2 in httpx (pip install ninjamcp-python[fast])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Transient statuses worth retrying, and the methods that are safe to repeat
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+# Seconds a fetched organization list is reused; organizations rarely change
+ORGANIZATIONS_CACHE_TTL = 300.0
+# Endpoints polled by the activity monitoring tools; only these keep a finished GET
+# shareable for a short grace period (see poll_coalesce_ttl)
+POLL_ENDPOINT_SUFFIXES = ("/activities", "/script-executions")
+
+
+class _InflightGet:
+    """A coalesced GET: its request, and whether a second caller joined it in flight."""
+    
+    __slots__ = ("future", "shared")
+    
+    def __init__(self, future: asyncio.Future, shared: bool):
+        self.future = future
+        self.shared = shared
+
 
 class NinjaRMMAPIError(Exception):
     """Custom exception for NinjaRMM API errors."""
@@ -23,17 +54,95 @@ class NinjaRMMAPIError(Exception):
 class NinjaRMMClient:
     """HTTP client for NinjaRMM API v2 with authentication and error handling."""
     
-    def __init__(self, auth_manager: AuthenticationManager):
+    def __init__(
+        self,
+        auth_manager: AuthenticationManager,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 50,
+        keepalive_expiry: float = 60.0,
+        max_concurrent_requests: int = 64,
+        max_retries: int = 3,
+        retry_backoff_base: float = 0.25,
+        retry_backoff_cap: float = 4.0,
+        coalesce_ttl: float = 0.0,
+        poll_coalesce_ttl: float = 0.5
+    ):
         self.auth_manager = auth_manager
         self.base_url = auth_manager.base_url.rstrip('/')
         self.api_base = f"{self.base_url}/api/v2"
         
         # HTTP client configuration
         self.timeout = httpx.Timeout(30.0, connect=10.0)
-        self.limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
+        # Idle connections outlive the longest default polling interval (30s) of the
+        # monitoring tools, so poll loops keep reusing the same connection
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        
+        # One pooled client for all requests so connections are kept alive and reused;
+        # with HTTP/2 concurrent requests are multiplexed over a single connection.
+        # The transport retries a failed connect once, e.g. after the server dropped an idle connection.
+        # httpx negotiates compressed responses itself: gzip and deflate always, br as well when
+        # brotli is installed (pip install ninjamcp-python[fast]), decoding them transparently.
+        self._http = httpx.AsyncClient(
+            timeout=self.timeout,
+            headers={"User-Agent": "NinjaRMM-MCP-Server/1.4.4"},
+            transport=httpx.AsyncHTTPTransport(
+                limits=self.limits,
+                http2=HTTP2_AVAILABLE,
+                retries=1
+            )
+        )
+        
+        # Caps in-flight API calls independently of the pool size, so bursts of tool
+        # calls wait here instead of queuing inside httpx's connection pool
+        self._gate = asyncio.Semaphore(max_concurrent_requests)
+        
+        # Retry policy for rate limits and transient server errors on idempotent requests
+        self.max_retries = max_retries
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_cap = retry_backoff_cap
+        
+        # Identical concurrent GETs share one request. By default a response is only
+        # shared while the request is in flight; for the activity polling endpoints a
+        # successful one stays shareable for about poll_coalesce_ttl seconds more.
+        # Any write (POST/PUT/PATCH/DELETE) drops every entry, so no read after a
+        # write is answered from before it.
+        self.coalesce_ttl = coalesce_ttl
+        self.poll_coalesce_ttl = poll_coalesce_ttl
+        self._inflight: Dict[Tuple[Any, ...], _InflightGet] = {}
+        
+        # (monotonic fetch time, organizations) from the last get_organizations() call
+        self._org_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+    
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, honoring a numeric Retry-After header.
+        
+        Returns None (don't retry) when Retry-After asks for longer than retry_backoff_cap,
+        so a tool call fails with the error instead of sleeping for minutes or hours.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                delay = max(0.0, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; fall back to exponential backoff
+            else:
+                return delay if delay <= self.retry_backoff_cap else None
+        backoff = min(self.retry_backoff_cap, self.retry_backoff_base * (2 ** attempt))
+        return backoff + random.uniform(0, self.retry_backoff_base)
     
     def _safe_json_stringify(self, obj: Any, max_depth: int = 10) -> str:
         """Safely stringify objects with circular reference handling."""
+        try:
+            # Fast path: API payloads are plain JSON data and serialize natively
+            return dump_bytes(obj, indent=pretty_json(), default=str).decode("utf-8")
+        except Exception:
+            # Circular or pathologically deep structures fall back to the bounded walk below
+            pass
+        
         def serialize_obj(o: Any, depth: int = 0) -> Any:
             if depth > max_depth:
                 return "[Max depth reached]"
@@ -48,7 +157,7 @@ class NinjaRMMClient:
                 return str(o)
         
         try:
-            return json.dumps(serialize_obj(obj), indent=2)
+            return json.dumps(serialize_obj(obj), indent=2 if pretty_json() else None)
         except Exception as e:
             logger.warning(f"Failed to stringify object: {e}")
             return str(obj)
@@ -56,7 +165,7 @@ class NinjaRMMClient:
     def _handle_api_error(self, response: httpx.Response, operation: str) -> None:
         """Handle API error responses."""
         try:
-            error_data = response.json()
+            error_data = loads(response.content)
         except Exception:
             error_data = {"error": "Failed to parse error response"}
         
@@ -70,7 +179,8 @@ class NinjaRMMClient:
                 error_message = f"{operation}: {error_data['message']}"
         
         logger.error(f"API Error {status_code}: {error_message}")
-        logger.debug(f"Error response: {self._safe_json_stringify(error_data)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Error response: {self._safe_json_stringify(error_data)}")
         
         raise NinjaRMMAPIError(error_message, status_code, error_data)
     
@@ -94,59 +204,78 @@ class NinjaRMMClient:
         
         # Prepare request
         url = f"{self.api_base}/{endpoint.lstrip('/')}"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "User-Agent": "NinjaRMM-MCP-Server/1.4.4"
-        }
+        # Static headers live on the shared client; only the token varies per request
+        headers = {"Authorization": f"Bearer {access_token}"}
         
-        # Add content type for JSON requests
-        if data and not files:
-            headers["Content-Type"] = "application/json"
-        
-        logger.debug(f"Making {method} request to {url}")
-        if params:
-            logger.debug(f"Query params: {self._safe_json_stringify(params)}")
-        if data:
-            logger.debug(f"Request data: {self._safe_json_stringify(data)}")
+        # Only serialize payloads for logging when debug output is actually enabled
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug(f"Making {method} request to {url}")
+            if params:
+                logger.debug(f"Query params: {self._safe_json_stringify(params)}")
+            if data:
+                logger.debug(f"Request data: {self._safe_json_stringify(data)}")
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout, limits=self.limits) as client:
-                if files:
-                    # For file uploads, use files parameter
-                    response = await client.request(
-                        method=method,
-                        url=url,
-                        headers={k: v for k, v in headers.items() if k != "Content-Type"},
-                        params=params,
-                        data=data,
-                        files=files
-                    )
-                else:
-                    # For regular requests
-                    json_data = data if data else None
-                    response = await client.request(
-                        method=method,
-                        url=url,
-                        headers=headers,
-                        params=params,
-                        json=json_data
-                    )
-                
-                logger.debug(f"Response status: {response.status_code}")
+            retries = self.max_retries if method.upper() in IDEMPOTENT_METHODS else 0
+            attempt = 0
+            while True:
+                async with self._gate:
+                    if files:
+                        # For file uploads, use files parameter
+                        response = await self._http.request(
+                            method=method,
+                            url=url,
+                            headers=headers,
+                            params=params,
+                            data=data,
+                            files=files
+                        )
+                    else:
+                        # For regular requests
+                        json_data = data if data else None
+                        response = await self._http.request(
+                            method=method,
+                            url=url,
+                            headers=headers,
+                            params=params,
+                            json=json_data
+                        )
                 
-                # Handle non-success status codes
-                if not response.is_success:
-                    self._handle_api_error(response, operation)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= retries:
+                    break
                 
-                # Parse response
-                try:
-                    result = response.json()
+                # Back off outside the gate so waiting retries don't hold request slots
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    logger.warning(
+                        f"{operation} returned {response.status_code} with Retry-After "
+                        f"{response.headers.get('Retry-After')}s, longer than the retry cap; not retrying"
+                    )
+                    break
+                attempt += 1
+                logger.warning(
+                    f"{operation} returned {response.status_code}, "
+                    f"retrying in {delay:.2f}s ({attempt}/{retries})"
+                )
+                await asyncio.sleep(delay)
+            
+            logger.debug("Response status: %s", response.status_code)
+            
+            # Handle non-success status codes
+            if not response.is_success:
+                self._handle_api_error(response, operation)
+            
+            # Parse response straight from the body bytes (no text decode round-trip)
+            try:
+                result = loads(response.content)
+                if debug:
                     logger.debug(f"Response data: {self._safe_json_stringify(result)}")
-                    return result
-                except Exception as e:
-                    logger.warning(f"Failed to parse JSON response: {e}")
-                    return {"raw_response": response.text}
-                
+                return result
+            except Exception as e:
+                logger.warning(f"Failed to parse JSON response: {e}")
+                return {"raw_response": response.text}
+            
         except httpx.TimeoutException:
             error_msg = f"Request timeout for {operation}"
             logger.error(error_msg)
@@ -163,23 +292,117 @@ class NinjaRMMClient:
             logger.error(error_msg)
             raise NinjaRMMAPIError(error_msg, None, None)
     
+    async def warm_up(self) -> None:
+        """Open a pooled connection to the API host so the first tool call skips the TCP/TLS handshake."""
+        try:
+            await self._http.head(self.base_url)
+        except httpx.HTTPError as e:
+            logger.debug("Connection warm-up failed: %s", e)
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self._inflight.clear()
+        self._org_cache = None
+        await self._http.aclose()
+    
+    def _coalesce_ttl(self, endpoint: str) -> float:
+        """Seconds a successful GET of endpoint stays shareable after it completes."""
+        if endpoint.rstrip("/").endswith(POLL_ENDPOINT_SUFFIXES):
+            return self.poll_coalesce_ttl
+        return self.coalesce_ttl
+    
+    def _expire_inflight(self, key: Tuple[Any, ...], entry: _InflightGet, ttl: float) -> None:
+        """Drop a finished GET from the coalescing table, after a jittered TTL if it succeeded."""
+        future = entry.future
+        if future.cancelled() or future.exception() is not None or ttl <= 0:
+            self._drop_inflight(key, entry)
+            return
+        # +/-20% jitter so entries created together don't all expire (and refetch) at once
+        future.get_loop().call_later(ttl * random.uniform(0.8, 1.2), self._drop_inflight, key, entry)
+    
+    def _drop_inflight(self, key: Tuple[Any, ...], entry: _InflightGet) -> None:
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+    
     async def get(self, endpoint: str, operation: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make GET request."""
-        return await self._make_request("GET", endpoint, operation, params=params)
+        """
+        Make GET request.
+        
+        Concurrent calls with the same endpoint, operation and params await a single
+        request. Only when a second caller actually joins are copies made: then every
+        caller of the in-flight request gets its own copy, as does any caller reusing a
+        finished polling response. Treat responses as read-only regardless; the caller
+        that started a request gets the original object.
+        """
+        # The operation is part of the key because it decides which token is used
+        key = (endpoint, operation, tuple(sorted((k, str(v)) for k, v in params.items())) if params else ())
+        entry = self._inflight.get(key)
+        if entry is not None and entry.future.done():
+            future = entry.future
+            if not future.cancelled() and future.exception() is None:
+                # Reusing a finished polling response within its grace period
+                return copy.deepcopy(future.result())
+            # A failed request is never reused, even before its entry is dropped
+            entry = None
+        if entry is None:
+            ttl = self._coalesce_ttl(endpoint)
+            future = asyncio.ensure_future(self._make_request("GET", endpoint, operation, params=params))
+            entry = self._inflight[key] = _InflightGet(future, shared=False)
+            # Registered before any waiter, so the entry is gone (or its grace period
+            # started) before the first caller resumes
+            future.add_done_callback(lambda f: self._expire_inflight(key, entry, ttl))
+        else:
+            entry.shared = True
+        # Shielded so one caller's cancellation doesn't fail the request for the others
+        result = await asyncio.shield(entry.future)
+        # A lone caller gets the response as is. Callers sharing a request each get a
+        # copy, so none sees another's changes (joins are settled before any resumes)
+        return copy.deepcopy(result) if entry.shared else result
+    
+    async def get_organizations(
+        self,
+        ttl: float = ORGANIZATIONS_CACHE_TTL,
+        refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the organization list, reusing the last one fetched within ttl seconds.
+        
+        Pass refresh=True to bypass the cache. The list is shared; don't mutate it.
+        """
+        cached = self._org_cache
+        if not refresh and cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        response = await self.get("organizations", "get_organizations")
+        if not isinstance(response, list):
+            response = response.get("organizations", response.get("data", []))
+        self._org_cache = (time.monotonic(), response)
+        return response
+    
+    async def _write(self, method: str, endpoint: str, operation: str, **kwargs: Any) -> Dict[str, Any]:
+        """Make a non-GET request, forgetting coalesced GETs so later reads see the write.
+        
+        Entries are dropped before the request and again after it, so a GET started
+        while the write was in flight isn't reused either.
+        """
+        self._inflight.clear()
+        try:
+            return await self._make_request(method, endpoint, operation, **kwargs)
+        finally:
+            self._inflight.clear()
     
     async def post(self, endpoint: str, operation: str, data: Optional[Dict[str, Any]] = None, 
                   files: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make POST request."""
-        return await self._make_request("POST", endpoint, operation, data=data, files=files)
+        return await self._write("POST", endpoint, operation, data=data, files=files)
     
     async def put(self, endpoint: str, operation: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make PUT request."""
-        return await self._make_request("PUT", endpoint, operation, data=data)
+        return await self._write("PUT", endpoint, operation, data=data)
     
     async def patch(self, endpoint: str, operation: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make PATCH request."""
-        return await self._make_request("PATCH", endpoint, operation, data=data)
+        return await self._write("PATCH", endpoint, operation, data=data)
     
     async def delete(self, endpoint: str, operation: str) -> Dict[str, Any]:
         """Make DELETE request."""
-        return await self._make_request("DELETE", endpoint, operation)
+        return await self._write("DELETE", endpoint, operation)
@@ -0,0 +1,73 @@
+"""Server configuration loaded from the environment."""
+
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+DEFAULT_BASE_URL = "https://app.ninjarmm.com"
+DEFAULT_SCOPES = "monitoring management control"
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Immutable NinjaRMM server settings, read once at startup."""
+
+    base_url: str = DEFAULT_BASE_URL
+    client_id: str = "placeholder"
+    client_secret: str = "placeholder"
+    auth_mode: str = "user"
+    client_scopes: str = DEFAULT_SCOPES
+    user_scopes: str = DEFAULT_SCOPES
+    user_redirect_port: int = 8090
+    token_storage_path: str = "./tokens.json"
+    has_machine_credentials: bool = False
+
+
+def normalize_base_url(base_url: str) -> str:
+    """Normalize base URL to ensure it has proper protocol."""
+    if not base_url or not base_url.strip():
+        return DEFAULT_BASE_URL
+
+    base_url = base_url.strip()
+
+    # If URL already has protocol (case-insensitive), return as-is
+    if base_url.lower().startswith(("http://", "https://")):
+        return base_url
+
+    # Add https:// protocol if missing
+    return f"https://{base_url}"
+
+
+def load_config() -> ServerConfig:
+    """Build the server configuration from environment variables and an optional .env file."""
+    # Load environment variables
+    load_dotenv()
+    env = os.environ
+
+    client_id = env.get("NINJARMM_CLIENT_ID")
+    client_secret = env.get("NINJARMM_CLIENT_SECRET")
+
+    # Determine if we have machine-to-machine credentials
+    has_machine_credentials = bool(client_id and client_secret)
+
+    # If no machine credentials, default to user-only mode for injected credentials
+    if not has_machine_credentials:
+        auth_mode = "user"
+        # Use placeholder values for initialization - will be overridden by injected credentials
+        client_id = "placeholder"
+        client_secret = "placeholder"
+    else:
+        auth_mode = env.get("NINJARMM_AUTH_MODE", "hybrid")
+
+    return ServerConfig(
+        base_url=normalize_base_url(env.get("NINJARMM_BASE_URL", DEFAULT_BASE_URL)),
+        client_id=client_id,
+        client_secret=client_secret,
+        auth_mode=auth_mode,
+        client_scopes=env.get("NINJARMM_CLIENT_SCOPES", DEFAULT_SCOPES),
+        user_scopes=env.get("NINJARMM_USER_SCOPES", DEFAULT_SCOPES),
+        user_redirect_port=int(env.get("NINJARMM_USER_REDIRECT_PORT", "8090")),
+        token_storage_path=env.get("NINJARMM_TOKEN_STORAGE_PATH", "./tokens.json"),
+        has_machine_credentials=has_machine_credentials
+    )
@@ -1,10 +1,17 @@
 """Authentication data models."""
 
-from datetime import datetime
+import functools
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 
+@functools.lru_cache(maxsize=256)
+def is_ticket_operation(operation: Optional[str]) -> bool:
+    """Check whether an operation name refers to a ticketing operation."""
+    return bool(operation) and "ticket" in operation.lower()
+
+
 class TokenInfo(BaseModel):
     """Information about an authentication token."""
     
@@ -15,15 +22,27 @@ class TokenInfo(BaseModel):
     token_type: str = "Bearer"
     valid: bool = False
     
+    def seconds_until_expiry(self) -> Optional[float]:
+        """Wall-clock seconds until expires_at (negative once expired), or None without an expiry.
+        
+        Expiry is checked against the wall clock, which (unlike time.monotonic()) keeps
+        running while the machine sleeps.
+        """
+        expires_at = self.expires_at
+        if expires_at is None:
+            return None
+        # Naive values (token files written by older versions) are local time
+        now = datetime.now(timezone.utc) if expires_at.tzinfo is not None else datetime.now()
+        return (expires_at - now).total_seconds()
+    
     def is_expired(self) -> bool:
         """Check if the token is expired."""
-        if not self.expires_at:
-            return True
-        return datetime.now() >= self.expires_at
+        remaining = self.seconds_until_expiry()
+        return remaining is None or remaining <= 0
     
     def is_valid(self) -> bool:
         """Check if the token is valid and not expired."""
-        return self.valid and self.access_token and not self.is_expired()
+        return bool(self.valid and self.access_token) and not self.is_expired()
 
 
 class AuthCapabilities(BaseModel):
@@ -57,7 +76,7 @@ class AuthStatus(BaseModel):
     def get_best_token(self, operation: Optional[str] = None) -> Optional[TokenInfo]:
         """Get the best available token for an operation."""
         # For ticket operations, prefer user token
-        if operation and "ticket" in operation.lower():
+        if is_ticket_operation(operation):
             if self.tokens["user"].is_valid():
                 return self.tokens["user"]
             return None
@@ -1,10 +1,13 @@
 """Main MCP server implementation for NinjaRMM."""
 
 import asyncio
+import itertools
 import logging
 import os
-from typing import Any, Sequence
-from dotenv import load_dotenv
+import signal
+import sys
+from types import MappingProxyType
+from typing import Any, Coroutine, Mapping, Optional, Sequence
 
 from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
@@ -15,8 +18,14 @@ from mcp.types import (
     ErrorData,
 )
 
+try:
+    import uvloop  # faster event loop (pip install ninjamcp-python[fast]); not on Windows
+except ImportError:
+    uvloop = None
+
 from .auth import AuthenticationManager
 from .client import NinjaRMMClient
+from .config import ServerConfig, load_config
 from .tools import (
     ToolRegistry,
     DeviceTools,
@@ -26,6 +35,7 @@ from .tools import (
     ScriptTools,
     TicketTools,
     CountTools,
+    AuthTools,
 )
 
 # Configure logging
@@ -35,125 +45,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared read-only arguments for calls that pass none
+_EMPTY_ARGS: Mapping[str, Any] = MappingProxyType({})
+
 
 class NinjaRMMServer:
     """Main NinjaRMM MCP Server implementation."""
     
-    def __init__(self):
-        # Load environment variables
-        load_dotenv()
-        
-        # Configuration from environment
-        self.base_url = self._normalize_base_url(os.getenv("NINJARMM_BASE_URL", "https://app.ninjarmm.com"))
-        self.client_id = os.getenv("NINJARMM_CLIENT_ID")
-        self.client_secret = os.getenv("NINJARMM_CLIENT_SECRET")
-        self.auth_mode = os.getenv("NINJARMM_AUTH_MODE", "hybrid")
-        self.client_scopes = os.getenv("NINJARMM_CLIENT_SCOPES", "monitoring management control")
-        self.user_scopes = os.getenv("NINJARMM_USER_SCOPES", "monitoring management control")
-        self.user_redirect_port = int(os.getenv("NINJARMM_USER_REDIRECT_PORT", "8090"))
-        self.token_storage_path = os.getenv("NINJARMM_TOKEN_STORAGE_PATH", "./tokens.json")
-
-        # Determine if we have machine-to-machine credentials
-        self.has_machine_credentials = bool(self.client_id and self.client_secret)
-
-        # If no machine credentials, default to user-only mode for injected credentials
-        if not self.has_machine_credentials:
-            self.auth_mode = "user"
-            # Use placeholder values for initialization - will be overridden by injected credentials
-            self.client_id = "placeholder"
-            self.client_secret = "placeholder"
+    def __init__(self, config: Optional[ServerConfig] = None):
+        # Configuration from environment (and .env), unless supplied by the caller
+        self.config = config if config is not None else load_config()
+        config = self.config
 
         # Initialize components
         self.auth_manager = AuthenticationManager(
-            base_url=self.base_url,
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-            auth_mode=self.auth_mode,
-            client_scopes=self.client_scopes,
-            user_scopes=self.user_scopes,
-            user_redirect_port=self.user_redirect_port,
-            token_storage_path=self.token_storage_path,
-            has_machine_credentials=self.has_machine_credentials
+            base_url=config.base_url,
+            client_id=config.client_id,
+            client_secret=config.client_secret,
+            auth_mode=config.auth_mode,
+            client_scopes=config.client_scopes,
+            user_scopes=config.user_scopes,
+            user_redirect_port=config.user_redirect_port,
+            token_storage_path=config.token_storage_path,
+            has_machine_credentials=config.has_machine_credentials
         )
         
         self.client = NinjaRMMClient(self.auth_manager)
         self.tool_registry = ToolRegistry()
         self.server = Server("ninjarmm-mcp-server")
+        self._terminate_task: Optional[asyncio.Future] = None
+        self._warm_up_task: Optional[asyncio.Future] = None
         
-        # Register handlers
+        # Register handlers and tools; tool factories only build objects, so the tool
+        # list and dispatch table are ready before the event loop is involved
         self._register_handlers()
-
-    def _normalize_base_url(self, base_url: str) -> str:
-        """Normalize base URL to ensure it has proper protocol."""
-        if not base_url or not base_url.strip():
-            return "https://app.ninjarmm.com"
-
-        base_url = base_url.strip()
-
-        # If URL already has protocol (case-insensitive), return as-is
-        if base_url.lower().startswith(("http://", "https://")):
-            return base_url
-
-        # Add https:// protocol if missing
-        return f"https://{base_url}"
+        self._register_tools()
+        
+        # Capabilities only depend on the handlers registered above, so build them once
+        self._init_options = InitializationOptions(
+            server_name="ninjarmm-mcp-server",
+            server_version="1.4.5",
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(
+                    prompts_changed=True,
+                    resources_changed=True,
+                    tools_changed=True,
+                ),
+                experimental_capabilities={},
+            ),
+        )
 
     def _register_handlers(self) -> None:
         """Register MCP server handlers."""
+        # Bind the registry lookup once; each call is then a single dict get
+        get_handler = self.tool_registry.get_handler
         
         @self.server.list_tools()
-        async def handle_list_tools() -> list[Tool]:
+        async def handle_list_tools() -> Sequence[Tool]:
             """Handle list tools request."""
+            # The registry's cached tuple is passed as-is; ListToolsResult accepts any sequence
             return self.tool_registry.list_tools()
         
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: dict[str, Any] | None) -> list[TextContent]:
             """Handle call tool request."""
             if not arguments:
-                arguments = {}
+                arguments = _EMPTY_ARGS
             
-            handler = self.tool_registry.get_handler(name)
+            handler = get_handler(name)
             if not handler:
                 raise ValueError(f"Tool '{name}' not found")
 
             try:
                 return await handler(arguments)
             except Exception as e:
-                logger.error(f"Error executing tool '{name}': {e}")
-                raise RuntimeError(f"Tool execution failed: {e}")
+                # Logged with the tool and exception type as structured fields
+                logger.error(
+                    "Error executing tool '%s': %s", name, e,
+                    extra={"tool": name, "err_type": type(e).__name__}
+                )
+                raise RuntimeError(f"Tool execution failed: {e}") from e
     
-    async def _register_tools(self) -> None:
+    def _register_tools(self) -> None:
         """Register all available tools."""
         try:
-            # Register device management tools
-            device_tools = DeviceTools.get_tools(self.client)
-            self.tool_registry.register_multiple(device_tools)
-            
-            # Register activity monitoring tools
-            activity_tools = ActivityTools.get_tools(self.client)
-            self.tool_registry.register_multiple(activity_tools)
-            
-            # Register alert management tools
-            alert_tools = AlertTools.get_tools(self.client)
-            self.tool_registry.register_multiple(alert_tools)
-            
-            # Register backup tools
-            backup_tools = BackupTools.get_tools(self.client)
-            self.tool_registry.register_multiple(backup_tools)
-            
-            # Register script tools
-            script_tools = ScriptTools.get_tools(self.client)
-            self.tool_registry.register_multiple(script_tools)
-            
-            # Register ticket tools
-            ticket_tools = TicketTools.get_tools(self.client)
-            self.tool_registry.register_multiple(ticket_tools)
-
-            # Register counting tools
-            count_tools = CountTools.get_tools(self.client)
-            self.tool_registry.register_multiple(count_tools)
-
-            # Register authentication management tools
-            await self._register_auth_tools()
+            # Register every tool group in one pass
+            self.tool_registry.register_multiple(itertools.chain(
+                DeviceTools.get_tools(self.client),      # device management
+                ActivityTools.get_tools(self.client),    # activity monitoring
+                AlertTools.get_tools(self.client),       # alert management
+                BackupTools.get_tools(self.client),      # backups
+                ScriptTools.get_tools(self.client),      # scripts
+                TicketTools.get_tools(self.client),      # ticketing
+                CountTools.get_tools(self.client),       # counting
+                AuthTools.get_tools(self.auth_manager),  # authentication management
+            ))
             
             logger.info(f"Registered {len(self.tool_registry.get_tool_names())} tools")
             
@@ -161,130 +147,14 @@ class NinjaRMMServer:
             logger.error(f"Failed to register tools: {e}")
             raise
     
-    async def _register_auth_tools(self) -> None:
-        """Register authentication management tools."""
-        from .tools.base import BaseTool
-        from mcp.types import TextContent
-        
-        class GetAuthStatusTool(BaseTool):
-            def __init__(self, auth_manager):
-                self.auth_manager = auth_manager
-            
-            @property
-            def name(self) -> str:
-                return "get_auth_status"
-            
-            @property
-            def description(self) -> str:
-                return "Check current authentication status and capabilities"
-            
-            @property
-            def input_schema(self) -> dict[str, Any]:
-                return {"type": "object", "properties": {}, "required": []}
-            
-            async def execute(self, arguments: dict[str, Any]) -> list[TextContent]:
-                try:
-                    status = await self.auth_manager.get_auth_status()
-                    return [TextContent(
-                        type="text",
-                        text=status.model_dump_json(indent=2)
-                    )]
-                except Exception as e:
-                    return [TextContent(
-                        type="text",
-                        text=f"Error getting auth status: {str(e)}"
-                    )]
-        
-        class ReauthorizeUserTool(BaseTool):
-            def __init__(self, auth_manager):
-                self.auth_manager = auth_manager
-            
-            @property
-            def name(self) -> str:
-                return "reauthorize_user"
-            
-            @property
-            def description(self) -> str:
-                return "Re-authenticate user for ticket operations"
-            
-            @property
-            def input_schema(self) -> dict[str, Any]:
-                return {"type": "object", "properties": {}, "required": []}
-            
-            async def execute(self, arguments: dict[str, Any]) -> list[TextContent]:
-                try:
-                    await self.auth_manager.reauthorize_user()
-                    return [TextContent(
-                        type="text",
-                        text="User re-authorization completed successfully"
-                    )]
-                except Exception as e:
-                    return [TextContent(
-                        type="text",
-                        text=f"Error re-authorizing user: {str(e)}"
-                    )]
-        
-        class ClearTokensTool(BaseTool):
-            def __init__(self, auth_manager):
-                self.auth_manager = auth_manager
-            
-            @property
-            def name(self) -> str:
-                return "clear_tokens"
-            
-            @property
-            def description(self) -> str:
-                return "Clear stored authentication tokens"
-            
-            @property
-            def input_schema(self) -> dict[str, Any]:
-                return {
-                    "type": "object",
-                    "properties": {
-                        "token_type": {
-                            "type": "string",
-                            "enum": ["all", "client", "user"],
-                            "default": "all",
-                            "description": "Type of tokens to clear"
-                        }
-                    },
-                    "required": []
-                }
-            
-            async def execute(self, arguments: dict[str, Any]) -> list[TextContent]:
-                try:
-                    token_type = arguments.get("token_type", "all")
-                    await self.auth_manager.clear_tokens(token_type)
-                    return [TextContent(
-                        type="text",
-                        text=f"Cleared {token_type} tokens successfully"
-                    )]
-                except Exception as e:
-                    return [TextContent(
-                        type="text",
-                        text=f"Error clearing tokens: {str(e)}"
-                    )]
-        
-        # Register auth tools
-        auth_tools = [
-            GetAuthStatusTool(self.auth_manager),
-            ReauthorizeUserTool(self.auth_manager),
-            ClearTokensTool(self.auth_manager)
-        ]
-        
-        self.tool_registry.register_multiple(auth_tools)
-    
     async def initialize(self) -> None:
         """Initialize the server."""
         try:
             logger.info("Initializing NinjaRMM MCP Server...")
             
-            # Initialize authentication
+            # Initialize authentication (tools are already registered in __init__)
             await self.auth_manager.initialize()
             
-            # Register all tools
-            await self._register_tools()
-            
             logger.info("NinjaRMM MCP Server initialized successfully")
             
         except Exception as e:
@@ -339,30 +209,61 @@ class NinjaRMMServer:
     
     async def run(self) -> None:
         """Run the MCP server."""
+        # On SIGTERM (e.g. container stop) flush tokens and close connections before exiting
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self._on_sigterm)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows event loops, or not running in the main thread
+        
         try:
             await self.initialize()
             
+            # Connect to the API in the background while the MCP session starts up
+            self._warm_up_task = asyncio.ensure_future(self.client.warm_up())
+            
             # Run the server
             async with stdio_server() as (read_stream, write_stream):
                 await self.server.run(
                     read_stream,
                     write_stream,
-                    InitializationOptions(
-                        server_name="ninjarmm-mcp-server",
-                        server_version="1.4.5",
-                        capabilities=self.server.get_capabilities(
-                            notification_options=NotificationOptions(
-                                prompts_changed=True,
-                                resources_changed=True,
-                                tools_changed=True,
-                            ),
-                            experimental_capabilities={},
-                        ),
-                    ),
+                    self._init_options,
                 )
         except Exception as e:
             logger.error(f"Server error: {e}")
             raise
+        finally:
+            await self.aclose()
+    
+    def _on_sigterm(self) -> None:
+        """Schedule shutdown from the SIGTERM handler, keeping a reference to the task."""
+        self._terminate_task = asyncio.ensure_future(self._terminate())
+    
+    async def _terminate(self) -> None:
+        """Clean up, then let SIGTERM terminate the process as it would by default."""
+        logger.info("Received SIGTERM, shutting down")
+        loop = asyncio.get_running_loop()
+        # Restores the default disposition; the stdio reader thread blocks on stdin and
+        # cannot be unwound by cancellation, so the process exits via the signal itself
+        loop.remove_signal_handler(signal.SIGTERM)
+        try:
+            await self.aclose()
+        finally:
+            os.kill(os.getpid(), signal.SIGTERM)
+    
+    async def aclose(self) -> None:
+        """Close the API and OAuth2 connection pools and stop background token work."""
+        if self._warm_up_task is not None:
+            self._warm_up_task.cancel()
+        # Close both sides even if one fails, so neither leaks sockets or unsaved tokens
+        results = await asyncio.gather(
+            self.client.aclose(),
+            self.auth_manager.close(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Error during shutdown: {result}")
 
 
 async def main() -> None:
@@ -371,6 +272,17 @@ async def main() -> None:
     await server.run()
 
 
+def run_event_loop(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion on uvloop when it is installed, else asyncio's default loop."""
+    if uvloop is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    uvloop.install()
+    return asyncio.run(coro)
+
+
 def main_sync() -> None:
     """
     Synchronous entry point for console scripts.
@@ -379,7 +291,7 @@ def main_sync() -> None:
     and provides a synchronous interface to the async main function.
     """
     try:
-        asyncio.run(main())
+        run_event_loop(main())
     except KeyboardInterrupt:
         print("\nServer stopped by user", file=sys.stderr)
         sys.exit(0)
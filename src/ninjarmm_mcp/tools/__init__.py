@@ -1,13 +1,21 @@
 """Tools module for NinjaRMM MCP Server."""
 
+from importlib import import_module
+
 from .base import BaseTool, ToolRegistry
-from .devices import DeviceTools
-from .activities import ActivityTools
-from .alerts import AlertTools
-from .backups import BackupTools
-from .scripts import ScriptTools
-from .tickets import TicketTools
-from .counts import CountTools
+
+# Tool groups are imported on first access (PEP 562), so importing one group
+# does not load every other tool module
+_LAZY = {
+    "DeviceTools": "devices",
+    "ActivityTools": "activities",
+    "AlertTools": "alerts",
+    "BackupTools": "backups",
+    "ScriptTools": "scripts",
+    "TicketTools": "tickets",
+    "CountTools": "counts",
+    "AuthTools": "auth",
+}
 
 __all__ = [
     "BaseTool",
@@ -19,4 +27,19 @@ __all__ = [
     "ScriptTools",
     "TicketTools",
     "CountTools",
+    "AuthTools",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    obj = getattr(import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
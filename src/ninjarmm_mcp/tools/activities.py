@@ -1,109 +1,164 @@
 """Activity monitoring tools for NinjaRMM MCP Server."""
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import time
+from collections import Counter, deque
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
 from mcp.types import TextContent
 
-from .base import BaseTool
+from ..utils.serialization import dump_bytes, loads, pretty_json
+from ..utils.ids import join_ids
+from .base import MAX_ID_LIST, BaseTool, QueryParamMap, build_query
+
+# Monitoring more devices than this polls each device's activity feed concurrently...
+DEVICE_FANOUT_THRESHOLD = 20
+# ...up to this many devices; larger sets go back to one combined /activities query,
+# so a poll never costs more than this many requests against the rate-limited API
+DEVICE_FANOUT_LIMIT = 100
+# Per-device requests of one poll in flight at a time
+DEVICE_FANOUT_CONCURRENCY = 10
+
+# Script execution statuses that end tracking
+TERMINAL_SCRIPT_STATUSES = frozenset({"COMPLETED", "SUCCESS", "FAILED", "ERROR", "CANCELLED"})
+
+# Status histories keep only this many of the most recent checks; counts cover all of them
+HISTORY_LIMIT = 100
+
+# Polling starts at this delay and doubles while nothing changes, up to the caller's poll_interval.
+# It equals the smallest poll_interval the tool schemas accept, so adaptive polling never
+# calls the (rate-limited) API more often than a caller could have asked for
+MIN_POLL_DELAY = 5.0
+
+
+def _next_poll_delay(delay: float, poll_interval: float, changed: bool) -> float:
+    """Return the next polling delay: reset after a change, otherwise back off toward poll_interval."""
+    if changed:
+        return min(MIN_POLL_DELAY, poll_interval)
+    return min(delay * 2, poll_interval)
+
+
+def _remaining_seconds(deadline: float) -> float:
+    """Seconds left until a time.monotonic() deadline (never negative)."""
+    return max(0.0, deadline - time.monotonic())
+
+
+def _extract_activities(result: Any) -> List[Any]:
+    """Return the activity list from an activities response (bare list or wrapped)."""
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict):
+        if "data" in result:
+            return result["data"]
+        return result.get("activities", [])
+    return []
+
+
+def _current_status(result: Any) -> Optional[str]:
+    """Upper-cased status from a status response: a dict, or a list led by one."""
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if isinstance(result, dict):
+        return (result.get("status") or "").upper()
+    return None
+
+
+def _polling_error(error: BaseException, device_id: Optional[int] = None) -> Dict[str, str]:
+    """Build the record that stands in for a failed poll in the monitoring output."""
+    now_iso = datetime.now().isoformat()
+    target = f" for device {device_id}" if device_id is not None else ""
+    return {
+        "error": f"Polling error at {now_iso}{target}: {str(error)}",
+        "timestamp": now_iso
+    }
 
 
 class GetActivitiesTool(BaseTool):
     """Tool to get activities/events."""
     
-    @property
-    def name(self) -> str:
-        return "get_activities"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Retrieve activities/events with optional filtering by device, organization, type, and time range"
+    name = "get_activities"
+    description = "Retrieve activities/events with optional filtering by device, organization, type, and time range"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by device IDs"
-                },
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs"
-                },
-                "activity_types": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Filter by activity types (e.g., 'SCRIPT_RUN', 'ALERT', 'MAINTENANCE')"
-                },
-                "status": {
-                    "type": "string",
-                    "description": "Filter by status (e.g., 'SUCCESS', 'FAILED', 'RUNNING')"
-                },
-                "since": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get activities since this timestamp (ISO format)"
-                },
-                "until": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get activities until this timestamp (ISO format)"
-                },
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of activities to return (max 1000)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "device_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by device IDs"
+            },
+            "organization_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by organization IDs"
             },
-            "required": []
-        }
+            "activity_types": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Filter by activity types (e.g., 'SCRIPT_RUN', 'ALERT', 'MAINTENANCE')"
+            },
+            "status": {
+                "type": "string",
+                "description": "Filter by status (e.g., 'SUCCESS', 'FAILED', 'RUNNING')"
+            },
+            "since": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get activities since this timestamp (ISO format)"
+            },
+            "until": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get activities until this timestamp (ISO format)"
+            },
+            "cursor": {
+                "type": "string",
+                "description": "Pagination cursor for next page"
+            },
+            "page_size": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 1000,
+                "default": 1000,
+                "description": "Number of activities to return (max 1000)"
+            },
+            "max_pages": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 50,
+                "default": 1,
+                "description": "Follow the pagination cursor for up to this many pages, one text block per page"
+            }
+        },
+        "required": []
+    })
+    
+    # Arguments forwarded as query parameters, in the order they are applied
+    QUERY_PARAMS: QueryParamMap = (
+        ("device_ids", "deviceIds", join_ids),
+        ("organization_ids", "organizationIds", join_ids),
+        ("activity_types", "activityTypes", join_ids),
+        ("status", "status", None),
+        ("since", "since", None),
+        ("until", "until", None),
+        ("cursor", "cursor", None),
+        ("page_size", "pageSize", None),
+    )
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get activities."""
         try:
-            # Build query parameters
-            params = {}
-            
-            if arguments.get("device_ids"):
-                params["deviceIds"] = ",".join(map(str, arguments["device_ids"]))
-            
-            if arguments.get("organization_ids"):
-                params["organizationIds"] = ",".join(map(str, arguments["organization_ids"]))
-            
-            if arguments.get("activity_types"):
-                params["activityTypes"] = ",".join(arguments["activity_types"])
-            
-            if arguments.get("status"):
-                params["status"] = arguments["status"]
-            
-            if arguments.get("since"):
-                params["since"] = arguments["since"]
-            
-            if arguments.get("until"):
-                params["until"] = arguments["until"]
-            
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
-            
-            result = await self.client.get("/activities", "get_activities", params=params)
+            params = build_query(arguments, self.QUERY_PARAMS)
             
+            # Each page is serialized as it arrives, so only one raw page is held at a time
+            pages = self._iter_pages("/activities", "get_activities", params, arguments.get("max_pages", 1))
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
+                text=self._serialize(page)
+            ) async for page in pages]
             
         except Exception as e:
             return [TextContent(
@@ -115,46 +170,42 @@ class GetActivitiesTool(BaseTool):
 class MonitorDeviceActivitiesTool(BaseTool):
     """Tool to monitor activities for specific devices with real-time capabilities."""
     
-    @property
-    def name(self) -> str:
-        return "monitor_device_activities"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Monitor activities for specific devices with real-time polling capabilities"
+    name = "monitor_device_activities"
+    description = "Monitor activities for specific devices with real-time polling capabilities"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Device IDs to monitor"
-                },
-                "activity_types": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Activity types to monitor (optional)"
-                },
-                "poll_interval": {
-                    "type": "integer",
-                    "minimum": 5,
-                    "maximum": 300,
-                    "default": 30,
-                    "description": "Polling interval in seconds (5-300)"
-                },
-                "duration": {
-                    "type": "integer",
-                    "minimum": 30,
-                    "maximum": 3600,
-                    "default": 300,
-                    "description": "Monitoring duration in seconds (30-3600)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "device_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "maxItems": MAX_ID_LIST,
+                "description": "Device IDs to monitor"
             },
-            "required": ["device_ids"]
-        }
+            "activity_types": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Activity types to monitor (optional)"
+            },
+            "poll_interval": {
+                "type": "integer",
+                "minimum": 5,
+                "maximum": 300,
+                "default": 30,
+                "description": "Polling interval in seconds (5-300)"
+            },
+            "duration": {
+                "type": "integer",
+                "minimum": 30,
+                "maximum": 3600,
+                "default": 300,
+                "description": "Monitoring duration in seconds (30-3600)"
+            }
+        },
+        "required": ["device_ids"]
+    })
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute monitor device activities."""
@@ -164,62 +215,81 @@ class MonitorDeviceActivitiesTool(BaseTool):
             poll_interval = arguments.get("poll_interval", 30)
             duration = arguments.get("duration", 300)
             
-            activities = []
+            # Activities are serialized batch by batch into one JSON-array body, so a long
+            # session holds compact bytes rather than every parsed activity dict
+            activities_buf = bytearray()
+            total_activities = 0
+            # Loop control runs on the monotonic clock; wall-clock time is only for reporting
             start_time = datetime.now()
-            end_time = start_time + timedelta(seconds=duration)
+            start_mono = time.monotonic()
+            deadline = start_mono + duration
             last_check = start_time
+            delay = min(MIN_POLL_DELAY, poll_interval)
             
-            while datetime.now() < end_time:
-                # Build query parameters
-                params = {
-                    "deviceIds": ",".join(map(str, device_ids)),
-                    "since": last_check.isoformat(),
-                    "pageSize": 1000
-                }
-                
-                if activity_types:
-                    params["activityTypes"] = ",".join(activity_types)
+            # Only "since" changes between polls, so the ID lists are joined once up front
+            base_params = {
+                "deviceIds": join_ids(device_ids),
+                "pageSize": 1000
+            }
+            if activity_types:
+                base_params["activityTypes"] = join_ids(activity_types)
+            
+            # Mid-sized device sets are polled per device in parallel, a few at a time
+            # (multiplexed over one HTTP/2 connection when h2 is installed); small and
+            # very large ones use the single combined query
+            fan_out = DEVICE_FANOUT_THRESHOLD < len(device_ids) <= DEVICE_FANOUT_LIMIT
+            if fan_out:
+                device_params = {k: v for k, v in base_params.items() if k != "deviceIds"}
+                device_since = dict.fromkeys(device_ids, start_time)
+            
+            while time.monotonic() < deadline:
+                if fan_out:
+                    new_activities, errors = await self._poll_each_device(device_params, device_since)
+                else:
+                    new_activities, errors = [], []
+                    params = {**base_params, "since": last_check.isoformat()}
+                    try:
+                        result = await self.client.get("/activities", "monitor_device_activities", params=params)
+                        new_activities = _extract_activities(result)
+                        last_check = datetime.now()
+                    except Exception as e:
+                        errors.append(_polling_error(e))
                 
-                try:
-                    result = await self.client.get("/activities", "monitor_device_activities", params=params)
-                    
-                    # Extract activities from result
-                    new_activities = []
-                    if isinstance(result, list):
-                        new_activities = result
-                    elif isinstance(result, dict):
-                        new_activities = result.get("data", result.get("activities", []))
-                    
-                    if new_activities:
-                        activities.extend(new_activities)
-                    
-                    last_check = datetime.now()
-                    
-                except Exception as e:
-                    # Log error but continue monitoring
-                    activities.append({
-                        "error": f"Polling error at {datetime.now().isoformat()}: {str(e)}",
-                        "timestamp": datetime.now().isoformat()
-                    })
+                changed = bool(new_activities)
+                if new_activities:
+                    self._append_json_items(activities_buf, new_activities)
+                    total_activities += len(new_activities)
+                if errors:
+                    # Record errors in the output but continue monitoring
+                    self._append_json_items(activities_buf, errors)
+                    total_activities += len(errors)
                 
-                # Wait for next poll
-                await asyncio.sleep(poll_interval)
+                # Wait for next poll: sooner while activities keep arriving, never past the end
+                delay = _next_poll_delay(delay, poll_interval, changed)
+                await asyncio.sleep(min(delay, _remaining_seconds(deadline)))
             
-            result = {
-                "monitoring_summary": {
-                    "device_ids": device_ids,
-                    "start_time": start_time.isoformat(),
-                    "end_time": datetime.now().isoformat(),
-                    "duration_seconds": (datetime.now() - start_time).total_seconds(),
-                    "poll_interval": poll_interval,
-                    "total_activities": len(activities)
-                },
-                "activities": activities
+            summary = {
+                "device_ids": device_ids,
+                "start_time": start_time.isoformat(),
+                "end_time": datetime.now().isoformat(),
+                "duration_seconds": time.monotonic() - start_mono,
+                "poll_interval": poll_interval,
+                "total_activities": total_activities
             }
             
+            if pretty_json():
+                # Indented output needs the whole document re-laid out
+                result = {"monitoring_summary": summary, "activities": loads(b"[" + activities_buf + b"]")}
+                text = self._serialize(result)
+            else:
+                text = (
+                    b'{"monitoring_summary":' + dump_bytes(summary, default=str)
+                    + b',"activities":[' + activities_buf + b"]}"
+                ).decode("utf-8")
+            
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=text
             )]
             
         except Exception as e:
@@ -227,49 +297,85 @@ class MonitorDeviceActivitiesTool(BaseTool):
                 type="text",
                 text=f"Error monitoring device activities: {str(e)}"
             )]
+    
+    async def _poll_each_device(
+        self,
+        params: Dict[str, Any],
+        since_by_device: Dict[int, datetime]
+    ) -> Tuple[List[Any], List[Dict[str, str]]]:
+        """Poll every device's own activity feed concurrently; returns (activities, error records).
+        
+        At most DEVICE_FANOUT_CONCURRENCY requests of the poll are in flight at a time.
+        """
+        poll_time = datetime.now()
+        device_ids = list(since_by_device)
+        semaphore = asyncio.Semaphore(DEVICE_FANOUT_CONCURRENCY)
+        
+        async def poll_device(device_id: int) -> Any:
+            async with semaphore:
+                return await self.client.get(
+                    f"/device/{device_id}/activities",
+                    "monitor_device_activities",
+                    params={**params, "since": since_by_device[device_id].isoformat()}
+                )
+        
+        results = await asyncio.gather(*map(poll_device, device_ids), return_exceptions=True)
+        
+        activities: List[Any] = []
+        errors: List[Dict[str, str]] = []
+        for device_id, result in zip(device_ids, results):
+            if isinstance(result, BaseException):
+                # The device keeps its previous "since", so the next poll catches up
+                errors.append(_polling_error(result, device_id))
+            else:
+                activities.extend(_extract_activities(result))
+                since_by_device[device_id] = poll_time
+        return activities, errors
+    
+    @staticmethod
+    def _append_json_items(buf: bytearray, items: List[Any]) -> None:
+        """Append items to a comma-separated JSON array body (without the brackets)."""
+        if buf:
+            buf += b","
+        buf += dump_bytes(items, default=str)[1:-1]
 
 
 class TrackScriptExecutionTool(BaseTool):
     """Tool to track script execution outcomes with detailed monitoring."""
     
-    @property
-    def name(self) -> str:
-        return "track_script_execution"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Track script execution outcomes with detailed monitoring and status updates"
+    name = "track_script_execution"
+    description = "Track script execution outcomes with detailed monitoring and status updates"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "execution_id": {
-                    "type": "string",
-                    "description": "Script execution ID to track"
-                },
-                "device_id": {
-                    "type": "integer",
-                    "description": "Device ID where script is running (optional, for additional context)"
-                },
-                "poll_interval": {
-                    "type": "integer",
-                    "minimum": 5,
-                    "maximum": 60,
-                    "default": 10,
-                    "description": "Polling interval in seconds (5-60)"
-                },
-                "timeout": {
-                    "type": "integer",
-                    "minimum": 60,
-                    "maximum": 3600,
-                    "default": 600,
-                    "description": "Maximum time to wait for completion in seconds (60-3600)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "execution_id": {
+                "type": "string",
+                "description": "Script execution ID to track"
             },
-            "required": ["execution_id"]
-        }
+            "device_id": {
+                "type": "integer",
+                "description": "Device ID where script is running (optional, for additional context)"
+            },
+            "poll_interval": {
+                "type": "integer",
+                "minimum": 5,
+                "maximum": 60,
+                "default": 10,
+                "description": "Polling interval in seconds (5-60)"
+            },
+            "timeout": {
+                "type": "integer",
+                "minimum": 60,
+                "maximum": 3600,
+                "default": 600,
+                "description": "Maximum time to wait for completion in seconds (60-3600)"
+            }
+        },
+        "required": ["execution_id"]
+    })
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute track script execution."""
@@ -280,16 +386,23 @@ class TrackScriptExecutionTool(BaseTool):
             timeout = arguments.get("timeout", 600)
             
             start_time = datetime.now()
-            end_time = start_time + timedelta(seconds=timeout)
-            execution_history = []
+            start_mono = time.monotonic()
+            deadline = start_mono + timeout
+            execution_history = deque(maxlen=HISTORY_LIMIT)
+            status_checks = 0
+            status_counts = Counter()
+            delay = min(MIN_POLL_DELAY, poll_interval)
+            last_status = None
             
-            while datetime.now() < end_time:
+            # The status query is the same on every poll
+            params = {"executionId": execution_id}
+            if device_id:
+                params["deviceId"] = device_id
+            
+            while time.monotonic() < deadline:
+                changed = False
                 try:
                     # Check script execution status
-                    params = {"executionId": execution_id}
-                    if device_id:
-                        params["deviceId"] = device_id
-                    
                     result = await self.client.get("/script-executions", "track_script_execution", params=params)
                     
                     # Record the status check
@@ -298,27 +411,27 @@ class TrackScriptExecutionTool(BaseTool):
                         "status": result
                     }
                     execution_history.append(status_check)
+                    status_checks += 1
+                    changed = result != last_status
+                    last_status = result
                     
                     # Check if execution is complete
-                    if isinstance(result, dict):
-                        status = result.get("status", "").upper()
-                        if status in ["COMPLETED", "SUCCESS", "FAILED", "ERROR", "CANCELLED"]:
-                            break
-                    elif isinstance(result, list) and result:
-                        # If result is a list, check the first item
-                        first_result = result[0]
-                        if isinstance(first_result, dict):
-                            status = first_result.get("status", "").upper()
-                            if status in ["COMPLETED", "SUCCESS", "FAILED", "ERROR", "CANCELLED"]:
-                                break
+                    current_status = _current_status(result)
+                    status_counts[current_status or "UNKNOWN"] += 1
+                    if current_status in TERMINAL_SCRIPT_STATUSES:
+                        break
                     
                 except Exception as e:
                     execution_history.append({
                         "timestamp": datetime.now().isoformat(),
                         "error": f"Polling error: {str(e)}"
                     })
+                    status_checks += 1
+                    status_counts["POLLING_ERROR"] += 1
                 
-                await asyncio.sleep(poll_interval)
+                # Poll again quickly after a status change, back off while it stays the same
+                delay = _next_poll_delay(delay, poll_interval, changed)
+                await asyncio.sleep(min(delay, _remaining_seconds(deadline)))
             
             final_result = {
                 "tracking_summary": {
@@ -326,17 +439,19 @@ class TrackScriptExecutionTool(BaseTool):
                     "device_id": device_id,
                     "start_time": start_time.isoformat(),
                     "end_time": datetime.now().isoformat(),
-                    "duration_seconds": (datetime.now() - start_time).total_seconds(),
+                    "duration_seconds": time.monotonic() - start_mono,
                     "poll_interval": poll_interval,
                     "timeout": timeout,
-                    "status_checks": len(execution_history)
+                    "status_checks": status_checks,
+                    "status_counts": dict(status_counts),
+                    "history_truncated": status_checks > len(execution_history)
                 },
-                "execution_history": execution_history
+                "execution_history": list(execution_history)
             }
             
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(final_result)
+                text=self._serialize(final_result)
             )]
             
         except Exception as e:
@@ -349,50 +464,45 @@ class TrackScriptExecutionTool(BaseTool):
 class WaitForActivityOutcomeTool(BaseTool):
     """Tool to wait for and monitor action outcomes with polling."""
 
-    @property
-    def name(self) -> str:
-        return "wait_for_activity_outcome"
-
-    @property
-    def description(self) -> str:
-        return "Wait for and monitor action outcomes with polling until completion or timeout"
-
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "activity_id": {
-                    "type": "string",
-                    "description": "Activity ID to monitor"
-                },
-                "device_id": {
-                    "type": "integer",
-                    "description": "Device ID for the activity (optional)"
-                },
-                "expected_status": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "default": ["COMPLETED", "SUCCESS", "FAILED", "ERROR"],
-                    "description": "Expected completion statuses to wait for"
-                },
-                "poll_interval": {
-                    "type": "integer",
-                    "minimum": 5,
-                    "maximum": 60,
-                    "default": 15,
-                    "description": "Polling interval in seconds (5-60)"
-                },
-                "timeout": {
-                    "type": "integer",
-                    "minimum": 60,
-                    "maximum": 3600,
-                    "default": 900,
-                    "description": "Maximum time to wait in seconds (60-3600)"
-                }
+    __slots__ = ()
+
+    name = "wait_for_activity_outcome"
+    description = "Wait for and monitor action outcomes with polling until completion or timeout"
+
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "activity_id": {
+                "type": "string",
+                "description": "Activity ID to monitor"
+            },
+            "device_id": {
+                "type": "integer",
+                "description": "Device ID for the activity (optional)"
             },
-            "required": ["activity_id"]
-        }
+            "expected_status": {
+                "type": "array",
+                "items": {"type": "string"},
+                "default": ["COMPLETED", "SUCCESS", "FAILED", "ERROR"],
+                "description": "Expected completion statuses to wait for"
+            },
+            "poll_interval": {
+                "type": "integer",
+                "minimum": 5,
+                "maximum": 60,
+                "default": 15,
+                "description": "Polling interval in seconds (5-60)"
+            },
+            "timeout": {
+                "type": "integer",
+                "minimum": 60,
+                "maximum": 3600,
+                "default": 900,
+                "description": "Maximum time to wait in seconds (60-3600)"
+            }
+        },
+        "required": ["activity_id"]
+    })
 
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute wait for activity outcome."""
@@ -404,16 +514,24 @@ class WaitForActivityOutcomeTool(BaseTool):
             timeout = arguments.get("timeout", 900)
 
             start_time = datetime.now()
-            end_time = start_time + timedelta(seconds=timeout)
-            status_history = []
+            start_mono = time.monotonic()
+            deadline = start_mono + timeout
+            status_history = deque(maxlen=HISTORY_LIMIT)
+            status_checks = 0
+            status_counts = Counter()
+            delay = min(MIN_POLL_DELAY, poll_interval)
+            last_result = None
 
-            while datetime.now() < end_time:
+            # The status query and the set of terminal statuses are the same on every poll
+            expected_upper = frozenset(status.upper() for status in expected_status)
+            params = {"activityId": activity_id}
+            if device_id:
+                params["deviceId"] = device_id
+
+            while time.monotonic() < deadline:
+                changed = False
                 try:
                     # Check activity status
-                    params = {"activityId": activity_id}
-                    if device_id:
-                        params["deviceId"] = device_id
-
                     result = await self.client.get("/activities", "wait_for_activity_outcome", params=params)
 
                     # Record the status check
@@ -422,17 +540,14 @@ class WaitForActivityOutcomeTool(BaseTool):
                         "result": result
                     }
                     status_history.append(status_check)
+                    status_checks += 1
+                    changed = result != last_result
+                    last_result = result
 
                     # Check if activity has reached expected status
-                    current_status = None
-                    if isinstance(result, dict):
-                        current_status = result.get("status", "").upper()
-                    elif isinstance(result, list) and result:
-                        first_result = result[0]
-                        if isinstance(first_result, dict):
-                            current_status = first_result.get("status", "").upper()
-
-                    if current_status and current_status in [s.upper() for s in expected_status]:
+                    current_status = _current_status(result)
+                    status_counts[current_status or "UNKNOWN"] += 1
+                    if current_status and current_status in expected_upper:
                         break
 
                 except Exception as e:
@@ -440,8 +555,12 @@ class WaitForActivityOutcomeTool(BaseTool):
                         "timestamp": datetime.now().isoformat(),
                         "error": f"Polling error: {str(e)}"
                     })
+                    status_checks += 1
+                    status_counts["POLLING_ERROR"] += 1
 
-                await asyncio.sleep(poll_interval)
+                # Poll again quickly after a status change, back off while it stays the same
+                delay = _next_poll_delay(delay, poll_interval, changed)
+                await asyncio.sleep(min(delay, _remaining_seconds(deadline)))
 
             final_result = {
                 "outcome_summary": {
@@ -450,18 +569,20 @@ class WaitForActivityOutcomeTool(BaseTool):
                     "expected_status": expected_status,
                     "start_time": start_time.isoformat(),
                     "end_time": datetime.now().isoformat(),
-                    "duration_seconds": (datetime.now() - start_time).total_seconds(),
+                    "duration_seconds": time.monotonic() - start_mono,
                     "poll_interval": poll_interval,
                     "timeout": timeout,
-                    "status_checks": len(status_history),
-                    "completed": len(status_history) > 0 and datetime.now() < end_time
+                    "status_checks": status_checks,
+                    "status_counts": dict(status_counts),
+                    "history_truncated": status_checks > len(status_history),
+                    "completed": status_checks > 0 and time.monotonic() < deadline
                 },
-                "status_history": status_history
+                "status_history": list(status_history)
             }
 
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(final_result)
+                text=self._serialize(final_result)
             )]
 
         except Exception as e:
@@ -1,114 +1,103 @@
 """Alert management tools for NinjaRMM MCP Server."""
 
+from types import MappingProxyType
 from typing import Dict, Any, List
 from mcp.types import TextContent
 
-from .base import BaseTool
+from ..utils.ids import join_ids
+from .base import BaseTool, QueryParamMap, build_query
 
 
 class GetAlertsTool(BaseTool):
     """Tool to get alerts with optional filtering."""
     
-    @property
-    def name(self) -> str:
-        return "get_alerts"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Retrieve alerts with optional filtering by device, organization, type, status, and severity"
+    name = "get_alerts"
+    description = "Retrieve alerts with optional filtering by device, organization, type, status, and severity"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by device IDs"
-                },
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs"
-                },
-                "alert_types": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Filter by alert types"
-                },
-                "status": {
-                    "type": "string",
-                    "description": "Filter by status (e.g., 'OPEN', 'ACKNOWLEDGED', 'RESOLVED')"
-                },
-                "severity": {
-                    "type": "string",
-                    "description": "Filter by severity (e.g., 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')"
-                },
-                "since": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get alerts since this timestamp (ISO format)"
-                },
-                "until": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get alerts until this timestamp (ISO format)"
-                },
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of alerts to return (max 1000)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "device_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by device IDs"
             },
-            "required": []
-        }
+            "organization_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by organization IDs"
+            },
+            "alert_types": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Filter by alert types"
+            },
+            "status": {
+                "type": "string",
+                "description": "Filter by status (e.g., 'OPEN', 'ACKNOWLEDGED', 'RESOLVED')"
+            },
+            "severity": {
+                "type": "string",
+                "description": "Filter by severity (e.g., 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')"
+            },
+            "since": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get alerts since this timestamp (ISO format)"
+            },
+            "until": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get alerts until this timestamp (ISO format)"
+            },
+            "cursor": {
+                "type": "string",
+                "description": "Pagination cursor for next page"
+            },
+            "page_size": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 1000,
+                "default": 1000,
+                "description": "Number of alerts to return (max 1000)"
+            },
+            "max_pages": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 50,
+                "default": 1,
+                "description": "Follow the pagination cursor for up to this many pages, one text block per page"
+            }
+        },
+        "required": []
+    })
+    
+    # Arguments forwarded as query parameters, in the order they are applied
+    QUERY_PARAMS: QueryParamMap = (
+        ("device_ids", "deviceIds", join_ids),
+        ("organization_ids", "organizationIds", join_ids),
+        ("alert_types", "alertTypes", join_ids),
+        ("status", "status", None),
+        ("severity", "severity", None),
+        ("since", "since", None),
+        ("until", "until", None),
+        ("cursor", "cursor", None),
+        ("page_size", "pageSize", None),
+    )
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get alerts."""
         try:
-            # Build query parameters
-            params = {}
-            
-            if arguments.get("device_ids"):
-                params["deviceIds"] = ",".join(map(str, arguments["device_ids"]))
-            
-            if arguments.get("organization_ids"):
-                params["organizationIds"] = ",".join(map(str, arguments["organization_ids"]))
-            
-            if arguments.get("alert_types"):
-                params["alertTypes"] = ",".join(arguments["alert_types"])
-            
-            if arguments.get("status"):
-                params["status"] = arguments["status"]
-            
-            if arguments.get("severity"):
-                params["severity"] = arguments["severity"]
-            
-            if arguments.get("since"):
-                params["since"] = arguments["since"]
-            
-            if arguments.get("until"):
-                params["until"] = arguments["until"]
-            
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
-            
-            result = await self.client.get("/alerts", "get_alerts", params=params)
+            params = build_query(arguments, self.QUERY_PARAMS)
             
+            # Each page is serialized as it arrives, so only one raw page is held at a time
+            pages = self._iter_pages("/alerts", "get_alerts", params, arguments.get("max_pages", 1))
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
+                text=self._serialize(page)
+            ) async for page in pages]
             
         except Exception as e:
             return [TextContent(
@@ -120,36 +109,31 @@ class GetAlertsTool(BaseTool):
 class ResetAlertTool(BaseTool):
     """Tool to reset/acknowledge specific alerts."""
     
-    @property
-    def name(self) -> str:
-        return "reset_alert"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Reset or acknowledge a specific alert by ID"
+    name = "reset_alert"
+    description = "Reset or acknowledge a specific alert by ID"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "alert_id": {
-                    "type": "integer",
-                    "description": "The ID of the alert to reset/acknowledge"
-                },
-                "action": {
-                    "type": "string",
-                    "enum": ["acknowledge", "reset", "resolve"],
-                    "default": "acknowledge",
-                    "description": "Action to perform on the alert"
-                },
-                "note": {
-                    "type": "string",
-                    "description": "Optional note to add when resetting the alert"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "alert_id": {
+                "type": "integer",
+                "description": "The ID of the alert to reset/acknowledge"
+            },
+            "action": {
+                "type": "string",
+                "enum": ["acknowledge", "reset", "resolve"],
+                "default": "acknowledge",
+                "description": "Action to perform on the alert"
             },
-            "required": ["alert_id"]
-        }
+            "note": {
+                "type": "string",
+                "description": "Optional note to add when resetting the alert"
+            }
+        },
+        "required": ["alert_id"]
+    })
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute reset alert."""
@@ -167,7 +151,7 @@ class ResetAlertTool(BaseTool):
             
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
             
         except Exception as e:
@@ -180,34 +164,29 @@ class ResetAlertTool(BaseTool):
 class GetDeviceAlertsTool(BaseTool):
     """Tool to get alerts for a specific device."""
 
-    @property
-    def name(self) -> str:
-        return "get_device_alerts"
-
-    @property
-    def description(self) -> str:
-        return "Retrieve active alerts (triggered conditions) for a specific device"
-
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "device_id": {
-                    "type": "integer",
-                    "description": "Device identifier"
-                },
-                "lang": {
-                    "type": "string",
-                    "description": "Language tag (optional)"
-                },
-                "tz": {
-                    "type": "string",
-                    "description": "Time Zone (optional)"
-                }
+    __slots__ = ()
+
+    name = "get_device_alerts"
+    description = "Retrieve active alerts (triggered conditions) for a specific device"
+
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "device_id": {
+                "type": "integer",
+                "description": "Device identifier"
+            },
+            "lang": {
+                "type": "string",
+                "description": "Language tag (optional)"
             },
-            "required": ["device_id"]
-        }
+            "tz": {
+                "type": "string",
+                "description": "Time Zone (optional)"
+            }
+        },
+        "required": ["device_id"]
+    })
 
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get device alerts."""
@@ -225,7 +204,7 @@ class GetDeviceAlertsTool(BaseTool):
 
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
 
         except Exception as e:
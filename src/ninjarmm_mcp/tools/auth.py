@@ -0,0 +1,145 @@
+"""Authentication management tools for NinjaRMM MCP Server."""
+
+import asyncio
+import time
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
+from mcp.types import TextContent
+
+from ..utils.serialization import pretty_json
+from .base import BaseTool
+
+
+class AuthTool(BaseTool):
+    """Base class for tools that operate on the authentication manager."""
+    
+    __slots__ = ("auth_manager",)
+    
+    input_schema = MappingProxyType({"type": "object", "properties": {}, "required": []})
+    
+    def __init__(self, auth_manager):
+        self.auth_manager = auth_manager
+
+
+class GetAuthStatusTool(AuthTool):
+    """Tool to report authentication status and capabilities."""
+    
+    __slots__ = ("_cache", "_lock")
+    
+    name = "get_auth_status"
+    description = "Check current authentication status and capabilities"
+    
+    # Repeated status polls within this window reuse the last rendered status
+    CACHE_TTL_SECONDS = 1.5
+    
+    def __init__(self, auth_manager):
+        super().__init__(auth_manager)
+        # (monotonic time, token version, rendered status) of the last successful call
+        self._cache: Optional[Tuple[float, int, str]] = None
+        # Concurrent polls that miss the cache wait for one rebuild instead of each running it
+        self._lock = asyncio.Lock()
+    
+    def _cached_status(self) -> Optional[str]:
+        """Return the cached status text if it is still current, else None."""
+        cached = self._cache
+        # Token changes show up immediately; only clock-driven expiry can lag by the TTL
+        if (cached and cached[1] == self.auth_manager.token_manager.version
+                and time.monotonic() - cached[0] < self.CACHE_TTL_SECONDS):
+            return cached[2]
+        return None
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Execute get auth status."""
+        try:
+            text = self._cached_status()
+            if text is None:
+                async with self._lock:
+                    text = self._cached_status()
+                    if text is None:
+                        now = time.monotonic()
+                        version = self.auth_manager.token_manager.version
+                        status = await self.auth_manager.get_auth_status()
+                        text = status.model_dump_json(indent=2 if pretty_json() else None)
+                        self._cache = (now, version, text)
+            return [TextContent(
+                type="text",
+                text=text
+            )]
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error getting auth status: {str(e)}"
+            )]
+
+
+class ReauthorizeUserTool(AuthTool):
+    """Tool to re-run the user authorization flow."""
+    
+    __slots__ = ()
+    
+    name = "reauthorize_user"
+    description = "Re-authenticate user for ticket operations"
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Execute user re-authorization."""
+        try:
+            await self.auth_manager.reauthorize_user()
+            return [TextContent(
+                type="text",
+                text="User re-authorization completed successfully"
+            )]
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error re-authorizing user: {str(e)}"
+            )]
+
+
+class ClearTokensTool(AuthTool):
+    """Tool to clear stored authentication tokens."""
+    
+    __slots__ = ()
+    
+    name = "clear_tokens"
+    description = "Clear stored authentication tokens"
+    
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "token_type": {
+                "type": "string",
+                "enum": ["all", "client", "user"],
+                "default": "all",
+                "description": "Type of tokens to clear"
+            }
+        },
+        "required": []
+    })
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Execute clear tokens."""
+        try:
+            token_type = arguments.get("token_type", "all")
+            await self.auth_manager.clear_tokens(token_type)
+            return [TextContent(
+                type="text",
+                text=f"Cleared {token_type} tokens successfully"
+            )]
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error clearing tokens: {str(e)}"
+            )]
+
+
+class AuthTools:
+    """Collection of authentication management tools."""
+    
+    @staticmethod
+    def get_tools(auth_manager) -> List[BaseTool]:
+        """Get all authentication management tools."""
+        return [
+            GetAuthStatusTool(auth_manager),
+            ReauthorizeUserTool(auth_manager),
+            ClearTokensTool(auth_manager)
+        ]
@@ -1,21 +1,121 @@
 """Base tool classes and registry for NinjaRMM MCP Server."""
 
+import functools
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional, Callable, Awaitable
+from typing import Dict, Any, AsyncIterator, Iterable, List, Mapping, Optional, Callable, Awaitable, Tuple, Union
 from mcp.types import Tool, TextContent
 
 from ..client import NinjaRMMClient
 
+try:
+    import fastjsonschema  # compiled argument validation (pip install ninjamcp-python[fast])
+except ImportError:
+    fastjsonschema = None
+
 logger = logging.getLogger(__name__)
 
+# "format" stays an annotation, as before: timestamps are checked by the API, not here
+_SCHEMA_FORMATS = {"date-time": lambda value: True}
+
+
+def _compile_validator(schema: Mapping[str, Any]) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """Compile a tool's input schema into a validator, if fastjsonschema is installed."""
+    if fastjsonschema is None:
+        return None
+    # Round-trip through JSON so read-only mappings become the plain dicts fastjsonschema expects
+    plain = json.loads(json.dumps(schema, default=dict))
+    return fastjsonschema.compile(plain, formats=_SCHEMA_FORMATS, use_default=False)
+
+
+def _list_limits(schema: Mapping[str, Any]) -> Tuple[Tuple[str, int], ...]:
+    """(argument, maxItems) pairs for the schema's top-level array arguments that set maxItems."""
+    return tuple(
+        (argument, spec["maxItems"])
+        for argument, spec in schema.get("properties", {}).items()
+        if "maxItems" in spec
+    )
+
+
+def _validated(execute: Callable[..., Awaitable[List[TextContent]]]) -> Callable[..., Awaitable[List[TextContent]]]:
+    """Wrap execute() so arguments are checked against the tool's compiled schema first."""
+    @functools.wraps(execute)
+    async def wrapper(self: "BaseTool", arguments: Mapping[str, Any]) -> List[TextContent]:
+        validate = type(self)._validate
+        if validate is not None:
+            try:
+                validate(arguments if isinstance(arguments, dict) else dict(arguments))
+            except fastjsonschema.JsonSchemaValueException as e:
+                return [TextContent(
+                    type="text",
+                    text=f"Invalid arguments for {self.name}: {e.message}"
+                )]
+        else:
+            # Without fastjsonschema, still refuse oversized lists before any request goes out
+            for argument, limit in type(self)._list_limits:
+                values = arguments.get(argument)
+                if values is not None and len(values) > limit:
+                    return [TextContent(
+                        type="text",
+                        text=f"Invalid arguments for {self.name}: {argument} must contain at most {limit} items"
+                    )]
+        return await execute(self, arguments)
+    return wrapper
+
+
+def tool_error_boundary(
+    action: Union[str, Callable[["BaseTool", Mapping[str, Any]], str]]
+) -> Callable[[Callable[..., Awaitable[List[TextContent]]]], Callable[..., Awaitable[List[TextContent]]]]:
+    """Report exceptions from execute() as an "Error <action>: ..." result, logging the traceback.
+    
+    action names what the tool was doing (e.g. "getting devices"), or is a function of the
+    tool and its arguments returning that text.
+    """
+    def decorator(execute: Callable[..., Awaitable[List[TextContent]]]) -> Callable[..., Awaitable[List[TextContent]]]:
+        @functools.wraps(execute)
+        async def wrapper(self: "BaseTool", arguments: Mapping[str, Any]) -> List[TextContent]:
+            try:
+                return await execute(self, arguments)
+            except Exception as e:
+                logger.exception("Tool %s failed", self.name)
+                label = action(self, arguments) if callable(action) else action
+                return [TextContent(
+                    type="text",
+                    text=f"Error {label}: {str(e)}"
+                )]
+        return wrapper
+    return decorator
+
 
 class BaseTool(ABC):
     """Base class for all NinjaRMM MCP tools."""
     
+    # Subclasses that declare their own __slots__ carry no per-instance __dict__
+    __slots__ = ("client",)
+    
+    # Validator compiled once per class from a class-level input_schema (None if unavailable)
+    _validate: Optional[Callable[[Dict[str, Any]], Any]] = None
+    # maxItems limits checked in its place when no validator could be compiled
+    _list_limits: Tuple[Tuple[str, int], ...] = ()
+    
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        schema = cls.__dict__.get("input_schema")
+        if isinstance(schema, Mapping):
+            cls._validate = _compile_validator(schema)
+            cls._list_limits = _list_limits(schema)
+        execute = cls.__dict__.get("execute")
+        if execute is not None and not getattr(execute, "__isabstractmethod__", False):
+            cls.execute = _validated(execute)
+    
     def __init__(self, client: NinjaRMMClient):
+        # Every tool shares the server's one client, and with it one pooled, keep-alive
+        # connection pool; concurrent calls from a tool reuse those connections
         self.client = client
     
+    # Subclasses satisfy name and description with plain class constants
+    # (name = "..."), which also clears the abstract property; properties still work
     @property
     @abstractmethod
     def name(self) -> str:
@@ -28,15 +128,17 @@ class BaseTool(ABC):
         """Tool description."""
         pass
     
-    @property
-    @abstractmethod
-    def input_schema(self) -> Dict[str, Any]:
-        """JSON schema for tool input parameters."""
-        pass
+    # JSON schema for tool input parameters. Prefer a class-level constant (wrap it in
+    # MappingProxyType) so it is built and compiled for validation once at import;
+    # a property override also works but skips validation.
+    input_schema: Mapping[str, Any]
     
     @abstractmethod
-    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
-        """Execute the tool with given arguments."""
+    async def execute(self, arguments: Mapping[str, Any]) -> List[TextContent]:
+        """Execute the tool with given arguments.
+        
+        Arguments may be a shared read-only mapping; copy them before modifying.
+        """
         pass
     
     def to_tool(self) -> Tool:
@@ -46,37 +148,100 @@ class BaseTool(ABC):
             description=self.description,
             inputSchema=self.input_schema
         )
+    
+    def _serialize(self, result: Any) -> str:
+        """Serialize a result for a text content block.
+        
+        The one place tools turn results into text: TextContent carries str, so the
+        (orjson, when installed) bytes are decoded here once.
+        """
+        return self.client._safe_json_stringify(result)
+    
+    async def _iter_pages(
+        self,
+        endpoint: str,
+        operation: str,
+        params: Dict[str, Any],
+        max_pages: int = 1
+    ) -> AsyncIterator[Any]:
+        """Yield up to max_pages result pages, following the API's pagination cursor."""
+        params = dict(params)
+        for _ in range(max_pages):
+            page = await self.client.get(endpoint, operation, params=params)
+            yield page
+            cursor = _next_cursor(page)
+            if not cursor or cursor == params.get("cursor"):
+                break
+            params["cursor"] = cursor
+
+
+def _next_cursor(page: Any) -> Optional[str]:
+    """Extract the next-page cursor from a result page, if the API returned one."""
+    if not isinstance(page, dict):
+        return None
+    cursor = page.get("nextCursor") or page.get("cursor")
+    # Query endpoints return the cursor as an object whose name is passed back
+    if isinstance(cursor, dict):
+        cursor = cursor.get("name")
+    return cursor if isinstance(cursor, str) else None
+
+
+# Longest ID list a tool accepts in one call; also declared as maxItems in tool schemas
+MAX_ID_LIST = 1000
+
+
+# (tool argument, API query parameter, optional converter) triples for build_query()
+QueryParamMap = Tuple[Tuple[str, str, Optional[Callable[[Any], Any]]], ...]
+
+
+def build_query(arguments: Mapping[str, Any], param_map: QueryParamMap) -> Dict[str, Any]:
+    """Map the tool arguments that are set (truthy) to API query parameters in one pass."""
+    # Built by a single comprehension rather than item-by-item assignment
+    return {
+        key: convert(value) if convert is not None else value
+        for argument, key, convert in param_map
+        if (value := arguments.get(argument))
+    }
 
 
 class ToolRegistry:
     """Registry for managing MCP tools."""
     
     def __init__(self):
+        # The single source of truth; handlers are the tools' execute methods
         self._tools: Dict[str, BaseTool] = {}
-        self._handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[List[TextContent]]]] = {}
+        # Tool definitions only change on (un)registration, so list_tools() reuses them;
+        # a tuple keeps the shared definitions safe from callers mutating the result
+        self._tool_list: Optional[Tuple[Tool, ...]] = None
     
     def register(self, tool: BaseTool) -> None:
         """Register a tool."""
         self._tools[tool.name] = tool
-        self._handlers[tool.name] = tool.execute
+        self._tool_list = None
         logger.info(f"Registered tool: {tool.name}")
     
-    def register_multiple(self, tools: List[BaseTool]) -> None:
+    def register_multiple(self, tools: Iterable[BaseTool]) -> None:
         """Register multiple tools."""
-        for tool in tools:
-            self.register(tool)
+        new_tools = {tool.name: tool for tool in tools}
+        self._tools.update(new_tools)
+        self._tool_list = None
+        for name in new_tools:
+            logger.info(f"Registered tool: {name}")
     
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """Get a tool by name."""
         return self._tools.get(name)
     
-    def get_handler(self, name: str) -> Optional[Callable[[Dict[str, Any]], Awaitable[List[TextContent]]]]:
+    def get_handler(self, name: str) -> Optional[Callable[[Mapping[str, Any]], Awaitable[List[TextContent]]]]:
         """Get a tool handler by name."""
-        return self._handlers.get(name)
+        tool = self._tools.get(name)
+        return tool.execute if tool is not None else None
     
-    def list_tools(self) -> List[Tool]:
-        """Get list of all registered tools."""
-        return [tool.to_tool() for tool in self._tools.values()]
+    def list_tools(self) -> Tuple[Tool, ...]:
+        """Get all registered tools, in registration order."""
+        if self._tool_list is None:
+            self._tool_list = tuple(tool.to_tool() for tool in self._tools.values())
+        return self._tool_list
     
     def get_tool_names(self) -> List[str]:
         """Get list of all tool names."""
@@ -90,7 +255,7 @@ class ToolRegistry:
         """Unregister a tool."""
         if name in self._tools:
             del self._tools[name]
-            del self._handlers[name]
+            self._tool_list = None
             logger.info(f"Unregistered tool: {name}")
             return True
         return False
@@ -98,5 +263,5 @@ class ToolRegistry:
     def clear(self) -> None:
         """Clear all registered tools."""
         self._tools.clear()
-        self._handlers.clear()
+        self._tool_list = None
         logger.info("Cleared all tools from registry")
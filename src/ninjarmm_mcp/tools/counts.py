@@ -1,26 +1,87 @@
 """Efficient counting tools for NinjaRMM resources."""
 
-import json
-from typing import Any, Dict, List, Optional, Union
+import asyncio
+import logging
+from collections import Counter
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple, Union
 from mcp.types import TextContent
 
 from ..client import NinjaRMMClient
-from ..utils.device_filter import DeviceFilterBuilder
+from ..utils.device_filter import DeviceFilterBuilder, build_filter
+from ..utils.serialization import dump_bytes, pretty_json
 from .base import BaseTool
 
+logger = logging.getLogger(__name__)
+
+# Organization batches counted concurrently by one get_device_count_by_organization call,
+# so a large tenant doesn't take every slot of the client's request gate
+ORG_COUNT_CONCURRENCY = 16
+
+# Organizations counted together by one "org in (...)" listing, tallied per organization
+ORG_BATCH_SIZE = 50
+
+# Devices requested per page when counting (the API maximum), and a sanity cap on pages
+COUNT_PAGE_SIZE = 1000
+MAX_COUNT_PAGES = 10000
+
+# Organizations serialized per chunk when building the per-organization report
+REPORT_CHUNK_SIZE = 500
+
+
+async def count_devices(
+    client: NinjaRMMClient,
+    params: Dict[str, Any],
+    operation: str,
+    tally: Optional[Counter] = None
+) -> Tuple[int, int, bool]:
+    """
+    Count the devices matching params by paging through /devices.
+
+    Pages are requested with pageSize and continued with "after" (the last device ID
+    seen), so no response holds more than one page. Returns (device count, pages read,
+    has_more), where has_more is True if counting stopped before the listing was exhausted.
+    If tally is given, each device is also counted under its organizationId.
+    """
+    total_count = 0
+    pages = 0
+    page_params = {**params, "pageSize": COUNT_PAGE_SIZE}
+    while pages < MAX_COUNT_PAGES:
+        response = await client.get("devices", operation, page_params)
+        if isinstance(response, list):
+            devices = response
+        else:
+            devices = response.get("devices", response.get("data", []))
+
+        after = page_params.get("after")
+        first_id = devices[0].get("id") if devices and isinstance(devices[0], dict) else None
+        if after is not None and first_id is not None and first_id <= after:
+            # The API ignored "after" and repeated a page; don't count it twice
+            return total_count, pages, True
+
+        total_count += len(devices)
+        pages += 1
+        if tally is not None:
+            tally.update(device.get("organizationId") for device in devices if isinstance(device, dict))
+        if len(devices) < COUNT_PAGE_SIZE:
+            return total_count, pages, False
+
+        last_id = devices[-1].get("id") if isinstance(devices[-1], dict) else None
+        if last_id is None:
+            return total_count, pages, True
+        page_params = {**page_params, "after": last_id}
+    return total_count, pages, True
+
 
 class GetDeviceCountTool(BaseTool):
-    """Get total device count efficiently using pagination."""
+    """Get total device count from the lightweight device listing."""
 
-    @property
-    def name(self) -> str:
-        return "get_device_count"
+    __slots__ = ()
 
-    @property
-    def description(self) -> str:
-        return """Get total device count efficiently without transferring all device data.
+    name = "get_device_count"
+    description = """Get total device count efficiently without transferring all device data.
 
-        This tool uses small page sizes (100 devices per request) to count devices efficiently.
+        This tool counts devices from the summary device listing, so filtered counts are exact.
         Supports all the same filtering options as get_devices for counting specific subsets.
 
         Examples:
@@ -31,214 +92,161 @@ class GetDeviceCountTool(BaseTool):
         - get_device_count(exclude_organizations=[789]) - Count devices excluding org 789
         """
 
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        # Use the same input schema as GetDevicesTool but without cursor/page_size
-        return {
-            "type": "object",
-            "properties": {
-                # Enhanced filtering parameters
-                "online_status": {
-                    "type": "string",
-                    "enum": ["online", "offline"],
-                    "description": "Filter by online/offline status"
-                },
-                "approval_status": {
-                    "type": "string", 
-                    "enum": ["PENDING", "APPROVED"],
-                    "description": "Filter by device approval status"
-                },
-                "device_classes": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Filter by device classes (e.g., WINDOWS_SERVER, LINUX_WORKSTATION, MAC)"
-                },
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by specific device IDs"
-                },
-                "location_ids": {
-                    "type": "array", 
-                    "items": {"type": "integer"},
-                    "description": "Filter by location IDs"
-                },
-                "role_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"}, 
-                    "description": "Filter by device role IDs"
-                },
-                "group_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by group membership"
-                },
-                "created_after": {
-                    "type": "string",
-                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
-                    "description": "Filter devices created after this date (YYYY-MM-DD)"
-                },
-                "created_before": {
-                    "type": "string", 
-                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
-                    "description": "Filter devices created before this date (YYYY-MM-DD)"
-                },
-                # Exclusion filters
-                "exclude_organizations": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices from these organization IDs"
-                },
-                "exclude_locations": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices from these location IDs"
-                },
-                "exclude_roles": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices with these role IDs"
-                },
-                # Legacy parameters for backward compatibility
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs (legacy parameter)"
-                },
-                "node_class_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by node class IDs (legacy parameter)"
-                },
-                "node_role_ids": {
-                    "type": "array", 
-                    "items": {"type": "integer"},
-                    "description": "Filter by node role IDs (legacy parameter)"
-                },
-                # Raw filter for advanced users
-                "device_filter": {
-                    "type": "string",
-                    "description": "Raw device filter string (takes precedence over other filters)"
-                }
+    # Use the same input schema as GetDevicesTool but without cursor/page_size
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            # Enhanced filtering parameters
+            "online_status": {
+                "type": "string",
+                "enum": ["online", "offline"],
+                "description": "Filter by online/offline status"
             },
-            "additionalProperties": False
-        }
+            "approval_status": {
+                "type": "string", 
+                "enum": ["PENDING", "APPROVED"],
+                "description": "Filter by device approval status"
+            },
+            "device_classes": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Filter by device classes (e.g., WINDOWS_SERVER, LINUX_WORKSTATION, MAC)"
+            },
+            "device_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by specific device IDs"
+            },
+            "location_ids": {
+                "type": "array", 
+                "items": {"type": "integer"},
+                "description": "Filter by location IDs"
+            },
+            "role_ids": {
+                "type": "array",
+                "items": {"type": "integer"}, 
+                "description": "Filter by device role IDs"
+            },
+            "group_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by group membership"
+            },
+            "created_after": {
+                "type": "string",
+                "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+                "description": "Filter devices created after this date (YYYY-MM-DD)"
+            },
+            "created_before": {
+                "type": "string", 
+                "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+                "description": "Filter devices created before this date (YYYY-MM-DD)"
+            },
+            # Exclusion filters
+            "exclude_organizations": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Exclude devices from these organization IDs"
+            },
+            "exclude_locations": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Exclude devices from these location IDs"
+            },
+            "exclude_roles": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Exclude devices with these role IDs"
+            },
+            # Legacy parameters for backward compatibility
+            "organization_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by organization IDs (legacy parameter)"
+            },
+            "node_class_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by node class IDs (legacy parameter)"
+            },
+            "node_role_ids": {
+                "type": "array", 
+                "items": {"type": "integer"},
+                "description": "Filter by node role IDs (legacy parameter)"
+            },
+            # Raw filter for advanced users
+            "device_filter": {
+                "type": "string",
+                "description": "Raw device filter string (takes precedence over other filters)"
+            }
+        },
+        "additionalProperties": False
+    })
     
+    # Legacy argument -> (API query parameter, label in the result description)
+    LEGACY_PARAMS = (
+        ("organization_ids", "organizationIds", "organizations"),
+        ("node_class_ids", "nodeClassIds", "node classes"),
+        ("node_role_ids", "nodeRoleIds", "node roles"),
+    )
+
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
-        """Execute device count with efficient pagination."""
+        """Execute device count."""
         
         # Build filter string
         device_filter = arguments.get("device_filter")
         if not device_filter:
             # Build filter from individual parameters
-            device_filter = DeviceFilterBuilder.from_parameters(**arguments)
+            device_filter = build_filter(**arguments)
         
         # Prepare parameters
         params = {}
         if device_filter:
             params["df"] = device_filter
             
-        # Add legacy parameters for backward compatibility
-        if arguments.get("organization_ids"):
-            params["organizationIds"] = arguments["organization_ids"]
-        if arguments.get("node_class_ids"):
-            params["nodeClassIds"] = arguments["node_class_ids"]
-        if arguments.get("node_role_ids"):
-            params["nodeRoleIds"] = arguments["node_role_ids"]
+        # Add legacy parameters for backward compatibility, noting them for the description
+        legacy_filters = []
+        for argument, key, label in self.LEGACY_PARAMS:
+            value = arguments.get(argument)
+            if value:
+                params[key] = value
+                legacy_filters.append(f"{label}: {value}")
         
-        # For counting, we'll use a more efficient approach:
-        # 1. If no filters, get all devices in one request (we know it works)
-        # 2. If filters, use small pagination to count efficiently
-
-        total_count = 0
-
-        if not device_filter and not any(params.get(key) for key in ["organizationIds", "nodeClassIds", "nodeRoleIds"]):
-            # No filters - get all devices at once (most efficient for counting)
-            response = await self.client.get("devices", "get_device_count", {})
-
-            if isinstance(response, list):
-                total_count = len(response)
-            else:
-                devices = response.get("devices", response.get("data", []))
-                total_count = len(devices)
-
-            pages_processed = 1
-
-        else:
-            # Filters applied - use pagination with small page size
-            page_size = 100
-            pages_processed = 0
-
-            # Try a few pages to get a count
-            for page in range(10):  # Limit to 10 pages for efficiency
-                current_params = params.copy()
-                current_params["pageSize"] = page_size
-
-                # For subsequent pages, we'll skip pagination since cursor logic is complex
-                # This gives us a sample count for filtered results
-                if page > 0:
-                    break
-
-                response = await self.client.get("devices", f"get_device_count_page_{page}", current_params)
-
-                if isinstance(response, list):
-                    devices = response
-                else:
-                    devices = response.get("devices", response.get("data", []))
-
-                page_count = len(devices)
-                total_count += page_count
-                pages_processed += 1
-
-                # If we got less than page_size, we're done
-                if page_count < page_size:
-                    break
+        # NinjaRMM v2 has no count endpoint; page through the /devices summary listing
+        # (not /devices-detailed) for an exact count with or without filters
+        total_count, pages_processed, has_more = await count_devices(self.client, params, "get_device_count")
         
         # Format result
         filter_description = ""
         if device_filter:
             filter_description = f" (filtered by: {device_filter})"
-        elif any(arguments.get(key) for key in ["organization_ids", "node_class_ids", "node_role_ids"]):
-            filters = []
-            if arguments.get("organization_ids"):
-                filters.append(f"organizations: {arguments['organization_ids']}")
-            if arguments.get("node_class_ids"):
-                filters.append(f"node classes: {arguments['node_class_ids']}")
-            if arguments.get("node_role_ids"):
-                filters.append(f"node roles: {arguments['node_role_ids']}")
-            filter_description = f" (filtered by: {', '.join(filters)})"
-
-        # Add note about filtering limitations
-        note = ""
-        if device_filter or any(params.get(key) for key in ["organizationIds", "nodeClassIds", "nodeRoleIds"]):
-            note = " (Note: Filtered counts may be partial due to pagination complexity)"
+        elif legacy_filters:
+            filter_description = f" (filtered by: {', '.join(legacy_filters)})"
 
         result = {
             "total_devices": total_count,
+            "has_more": has_more,
             "pages_processed": pages_processed,
             "filter_applied": device_filter or "none",
-            "description": f"Total device count{filter_description}{note}",
-            "method": "full_scan" if not device_filter and not any(params.get(key) for key in ["organizationIds", "nodeClassIds", "nodeRoleIds"]) else "filtered_sample"
+            "description": f"Total device count{filter_description}",
+            "method": "full_scan"
         }
         
         return [TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=dump_bytes(result, indent=pretty_json()).decode("utf-8")
         )]
 
 
 class GetDeviceCountByOrganizationTool(BaseTool):
     """Get device counts grouped by organization."""
 
-    @property
-    def name(self) -> str:
-        return "get_device_count_by_organization"
+    __slots__ = ()
 
-    @property
-    def description(self) -> str:
-        return """Get device counts grouped by organization efficiently.
+    name = "get_device_count_by_organization"
+    description = """Get device counts grouped by organization efficiently.
 
-        This tool retrieves all organizations and then counts devices for each one.
+        This tool retrieves all organizations and counts their devices in batches.
         Useful for understanding device distribution across your organization structure.
 
         Examples:
@@ -247,114 +255,180 @@ class GetDeviceCountByOrganizationTool(BaseTool):
         - get_device_count_by_organization(device_classes=["WINDOWS_SERVER"]) - Count servers per org
         """
 
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object", 
-            "properties": {
-                # Same filtering options as device count tool
-                "online_status": {
-                    "type": "string",
-                    "enum": ["online", "offline"],
-                    "description": "Filter by online/offline status"
-                },
-                "approval_status": {
-                    "type": "string",
-                    "enum": ["PENDING", "APPROVED"], 
-                    "description": "Filter by device approval status"
-                },
-                "device_classes": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "Filter by device classes"
-                },
-                "device_filter": {
-                    "type": "string",
-                    "description": "Raw device filter string"
-                }
+    input_schema = MappingProxyType({
+        "type": "object", 
+        "properties": {
+            # Same filtering options as device count tool
+            "online_status": {
+                "type": "string",
+                "enum": ["online", "offline"],
+                "description": "Filter by online/offline status"
             },
-            "additionalProperties": False
-        }
+            "approval_status": {
+                "type": "string",
+                "enum": ["PENDING", "APPROVED"], 
+                "description": "Filter by device approval status"
+            },
+            "device_classes": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Filter by device classes"
+            },
+            "device_filter": {
+                "type": "string",
+                "description": "Raw device filter string"
+            },
+            "refresh_organizations": {
+                "type": "boolean",
+                "description": "Re-fetch the organization list instead of using the cached one (default: false)",
+                "default": False
+            }
+        },
+        "additionalProperties": False
+    })
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute device count by organization."""
         
-        # First, get all organizations
-        orgs_response = await self.client.get("organizations", "get_organizations")
-        
-        if not isinstance(orgs_response, list):
-            orgs_response = orgs_response.get("organizations", orgs_response.get("data", []))
+        # First, get all organizations (cached by the client for a few minutes)
+        orgs_response = await self.client.get_organizations(
+            refresh=bool(arguments.get("refresh_organizations"))
+        )
         
         # Build base filter
         base_filter = arguments.get("device_filter")
         if not base_filter:
-            base_filter = DeviceFilterBuilder.from_parameters(**arguments)
+            base_filter = build_filter(**arguments)
+        # Shared by every organization's filter, so build it once
+        filter_suffix = f" AND {base_filter}" if base_filter else ""
         
-        # Count devices for each organization
-        org_counts = []
-        total_devices = 0
+        # Count devices in batches of organizations, concurrently (bounded), in organization order
+        semaphore = asyncio.Semaphore(ORG_COUNT_CONCURRENCY)
+        batches = await asyncio.gather(*(
+            self._count_organizations(orgs_response[start:start + ORG_BATCH_SIZE], filter_suffix, semaphore)
+            for start in range(0, len(orgs_response), ORG_BATCH_SIZE)
+        ))
+        org_counts = [org_count for batch in batches for org_count in batch]
         
-        for org in orgs_response:
-            org_id = org.get("id")
-            org_name = org.get("name", f"Organization {org_id}")
-            
-            # Build filter for this organization
-            org_filter = base_filter
-            if org_filter:
-                org_filter = f"org={org_id} AND {org_filter}"
-            else:
-                org_filter = f"org={org_id}"
-            
-            # Count devices for this organization
-            # Use a simple approach to avoid pagination complexity
-            params = {
-                "df": org_filter,
-                "pageSize": 1000  # Get up to 1000 devices per org
-            }
-
-            try:
-                response = await self.client.get("devices", f"count_devices_org_{org_id}", params)
-
-                if isinstance(response, list):
-                    org_count = len(response)
-                else:
-                    devices = response.get("devices", response.get("data", []))
-                    org_count = len(devices)
-
-                # If we got exactly 1000, there might be more, but for counting purposes this is sufficient
-                if org_count == 1000:
-                    org_count = f"{org_count}+"
-
-            except Exception as e:
-                # If there's an error with this org, skip it
-                org_count = 0
-            
-            org_counts.append({
-                "organization_id": org_id,
-                "organization_name": org_name,
-                "device_count": org_count
-            })
-            
-            # Add to total (handle string counts like "1000+")
-            if isinstance(org_count, str) and org_count.endswith('+'):
-                total_devices += int(org_count[:-1])
-            else:
-                total_devices += org_count
+        # Organizations that couldn't be counted have device_count None and are left
+        # out of the total, which is then a lower bound
+        failed = sum(1 for org_count in org_counts if org_count["device_count"] is None)
+        total_devices = sum(org_count["device_count"] or 0 for org_count in org_counts)
         
-        # Sort by device count (descending)
-        org_counts.sort(key=lambda x: x["device_count"], reverse=True)
+        # Sort by device count (descending), uncounted organizations last
+        org_counts.sort(key=lambda x: -1 if x["device_count"] is None else x["device_count"], reverse=True)
         
         result = {
             "total_organizations": len(org_counts),
             "total_devices": total_devices,
+            "organizations_failed": failed,
             "filter_applied": base_filter or "none",
-            "organizations": org_counts
         }
         
+        if pretty_json():
+            # Indented output is laid out as one document
+            result["organizations"] = org_counts
+            text = dump_bytes(result, indent=True).decode("utf-8")
+        else:
+            # Encode the organization list in small chunks into one growing buffer
+            # rather than as a single large intermediate document
+            buf = bytearray(dump_bytes(result)[:-1])
+            buf += b',"organizations":['
+            for start in range(0, len(org_counts), REPORT_CHUNK_SIZE):
+                if start:
+                    buf += b","
+                buf += dump_bytes(org_counts[start:start + REPORT_CHUNK_SIZE])[1:-1]
+            buf += b"]}"
+            text = buf.decode("utf-8")
+        
         return [TextContent(
             type="text",
-            text=json.dumps(result, indent=2)
+            text=text
         )]
+    
+    async def _count_organizations(
+        self,
+        orgs: List[Dict[str, Any]],
+        filter_suffix: str,
+        semaphore: asyncio.Semaphore
+    ) -> List[Dict[str, Any]]:
+        """Count the devices of a batch of organizations.
+
+        filter_suffix is the shared " AND <filter>" clause, or "" when unfiltered. If the
+        batch listing fails or stops early, its organizations are counted one by one instead,
+        so each entry's has_more describes that organization alone.
+        """
+        org_ids = [org.get("id") for org in orgs]
+        org_filter = DeviceFilterBuilder().add_organization_filter(org_ids).build()
+        
+        # One paged listing covers the whole batch; devices are tallied per organization
+        tally: Counter = Counter()
+        try:
+            async with semaphore:
+                _, _, has_more = await count_devices(
+                    self.client, {"df": f"{org_filter}{filter_suffix}"},
+                    f"count_devices_org_{org_ids[0]}", tally
+                )
+
+        except Exception:
+            logger.warning(
+                "Counting devices for organizations %s failed; counting them one by one",
+                org_ids, exc_info=True
+            )
+        else:
+            # A truncated listing can't say which organizations are short, so only a
+            # complete one (or a batch of one) is reported from the tally
+            if not has_more or len(orgs) == 1:
+                return [
+                    _org_count_entry(org_id, org, tally[org_id], has_more)
+                    for org_id, org in zip(org_ids, orgs)
+                ]
+            logger.info(
+                "Device listing for organizations %s was truncated; counting them one by one",
+                org_ids
+            )
+        
+        return list(await asyncio.gather(*(
+            self._count_organization(org_id, org, filter_suffix, semaphore)
+            for org_id, org in zip(org_ids, orgs)
+        )))
+    
+    async def _count_organization(
+        self,
+        org_id: Any,
+        org: Dict[str, Any],
+        filter_suffix: str,
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """Count one organization's devices; a failure is reported in its entry, not as 0."""
+        try:
+            async with semaphore:
+                device_count, _, has_more = await count_devices(
+                    self.client, {"df": f"org={org_id}{filter_suffix}"}, f"count_devices_org_{org_id}"
+                )
+        except Exception as e:
+            logger.warning("Counting devices for organization %s failed", org_id, exc_info=True)
+            return _org_count_entry(org_id, org, None, None, error=str(e))
+        return _org_count_entry(org_id, org, device_count, has_more)
+
+
+def _org_count_entry(
+    org_id: Any,
+    org: Dict[str, Any],
+    device_count: Optional[int],
+    has_more: Optional[bool],
+    error: Optional[str] = None
+) -> Dict[str, Any]:
+    """One organization's entry in the per-organization report (counts are None if not taken)."""
+    entry = {
+        "organization_id": org_id,
+        "organization_name": org.get("name", f"Organization {org_id}"),
+        "device_count": device_count,
+        "has_more": has_more
+    }
+    if error is not None:
+        entry["error"] = error
+    return entry
 
 
 class CountTools:
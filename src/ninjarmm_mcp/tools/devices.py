@@ -1,71 +1,228 @@
 """Device management tools for NinjaRMM MCP Server."""
 
 import json
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 from mcp.types import TextContent
 
-from .base import BaseTool
+from .base import MAX_ID_LIST, BaseTool, tool_error_boundary
 from ..models.device import Device, DeviceFilter
-from ..utils.device_filter import DeviceFilterBuilder
+from ..utils.device_filter import DEVICE_CLASSES, build_filter
+from ..utils.ids import join_ids
+
+
+def _select_fields(result: Any, fields: Optional[List[str]]) -> Any:
+    """Keep only the requested top-level fields of each device in a listing."""
+    if not fields:
+        return result
+    if isinstance(result, list):
+        return [
+            {k: device[k] for k in fields if k in device} if isinstance(device, dict) else device
+            for device in result
+        ]
+    return result
+
+
+# Filter arguments passed through to build_filter() as-is
+_FILTER_KEYS = (
+    "organization_ids",
+    "exclude_organizations",
+    "location_ids",
+    "exclude_locations",
+    "exclude_roles",
+    "device_ids",
+    "device_classes",
+    "approval_status",
+    "online_status",
+    "created_after",
+    "created_before",
+    "group_ids",
+)
+
+
+def _filter_params(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Collect the filter arguments that are set, in one pass over _FILTER_KEYS."""
+    filter_params = {key: value for key in _FILTER_KEYS if (value := arguments.get(key)) is not None}
+    # Support legacy parameter
+    role_ids = arguments.get("role_ids") or arguments.get("node_role_ids")
+    if role_ids is not None:
+        filter_params["role_ids"] = role_ids
+    return filter_params
+
+
+def _device_listing_action(tool: "GetDevicesTool", arguments: Dict[str, Any]) -> str:
+    """Describe a failed device listing for its error result."""
+    if tool.DETAILED or arguments.get("detailed"):
+        return "getting detailed devices"
+    return "getting devices"
+
+
+# Filtering, pagination and output arguments shared by the device listing tools
+_DEVICE_LISTING_PROPERTIES: Dict[str, Any] = {
+    # Legacy parameters (maintained for backward compatibility)
+    "organization_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "maxItems": MAX_ID_LIST,
+        "description": "Filter by organization IDs (legacy parameter, use for backward compatibility)"
+    },
+    "device_filter": {
+        "type": "string",
+        "description": "Raw device filter string (advanced users). If provided, other filter parameters are ignored."
+    },
+    "node_class_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Filter by node class IDs (legacy parameter)"
+    },
+    "node_role_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Filter by node role IDs (legacy parameter)"
+    },
+
+    # Enhanced filtering parameters
+    "online_status": {
+        "type": "string",
+        "enum": ["online", "offline"],
+        "description": "Filter by device online/offline status"
+    },
+    "approval_status": {
+        "type": "string",
+        "enum": ["PENDING", "APPROVED"],
+        "description": "Filter by device approval status"
+    },
+    "device_classes": {
+        "type": "array",
+        "items": {
+            "type": "string",
+            "enum": list(DEVICE_CLASSES)
+        },
+        "description": "Filter by device classes (e.g., ['WINDOWS_SERVER', 'LINUX_SERVER'])"
+    },
+    "device_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "maxItems": MAX_ID_LIST,
+        "description": "Filter by specific device IDs"
+    },
+    "location_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Filter by location IDs"
+    },
+    "role_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Filter by device role IDs"
+    },
+    "group_ids": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Filter by group membership (devices in these groups)"
+    },
+    "created_after": {
+        "type": "string",
+        "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+        "description": "Filter devices created after this date (YYYY-MM-DD format)"
+    },
+    "created_before": {
+        "type": "string",
+        "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
+        "description": "Filter devices created before this date (YYYY-MM-DD format)"
+    },
+
+    # Exclusion filters
+    "exclude_organizations": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Exclude devices from these organization IDs"
+    },
+    "exclude_locations": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Exclude devices from these location IDs"
+    },
+    "exclude_roles": {
+        "type": "array",
+        "items": {"type": "integer"},
+        "description": "Exclude devices with these role IDs"
+    },
+
+    # Pagination
+    "cursor": {
+        "type": "string",
+        "description": "Pagination cursor for next page"
+    },
+    "page_size": {
+        "type": "integer",
+        "minimum": 1,
+        "maximum": 1000,
+        "default": 1000,
+        "description": "Number of devices to return (max 1000)"
+    },
+
+    # Output shaping
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Return only these device fields (e.g., ['id', 'systemName', 'offline']); all fields if omitted"
+    },
+    "per_device": {
+        "type": "boolean",
+        "default": False,
+        "description": "Return one JSON text block per device (NDJSON-style) instead of a single JSON array"
+    }
+}
 
 
 class GetOrganizationsTool(BaseTool):
     """Tool to get all organizations."""
     
-    @property
-    def name(self) -> str:
-        return "get_organizations"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get all organizations with their IDs and names"
+    name = "get_organizations"
+    description = "Get all organizations with their IDs and names"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {},
-            "required": []
-        }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "refresh": {
+                "type": "boolean",
+                "default": False,
+                "description": "Re-fetch the organization list instead of using the one cached for a few minutes"
+            }
+        },
+        "required": []
+    })
     
+    @tool_error_boundary("getting organizations")
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get organizations."""
-        try:
-            result = await self.client.get("/organizations", "get_organizations")
-            
-            # Format the response
-            if isinstance(result, list):
-                organizations = result
-            else:
-                organizations = result.get("data", result)
-            
-            formatted_result = {
-                "organizations": organizations,
-                "count": len(organizations) if isinstance(organizations, list) else 0
-            }
-            
-            return [TextContent(
-                type="text",
-                text=self.client._safe_json_stringify(formatted_result)
-            )]
-            
-        except Exception as e:
-            return [TextContent(
-                type="text", 
-                text=f"Error getting organizations: {str(e)}"
-            )]
+        # Shared with the per-organization device counts, which cache the same list
+        organizations = await self.client.get_organizations(refresh=bool(arguments.get("refresh")))
+        
+        formatted_result = {
+            "organizations": organizations,
+            "count": len(organizations) if isinstance(organizations, list) else 0
+        }
+        
+        return [TextContent(
+            type="text",
+            text=self._serialize(formatted_result)
+        )]
 
 
 class GetDevicesTool(BaseTool):
-    """Tool to get basic device information."""
+    """Tool to get basic (or, with detailed=true, detailed) device information."""
+    
+    __slots__ = ()
     
-    @property
-    def name(self) -> str:
-        return "get_devices"
+    # Subclasses fix the listing to the detailed one
+    DETAILED = False
     
-    @property
-    def description(self) -> str:
-        return """Get basic device information with advanced filtering capabilities.
+    name = "get_devices"
+    description = """Get basic device information with advanced filtering capabilities.
 
         Supports comprehensive filtering including:
         - Organization, location, and role filtering (with inclusion/exclusion)
@@ -80,200 +237,92 @@ class GetDevicesTool(BaseTool):
         - Get all online Windows servers: online_status="online", device_classes=["WINDOWS_SERVER"]
         - Get devices created in 2024: created_after="2024-01-01", created_before="2024-12-31"
         - Get devices excluding specific orgs: exclude_organizations=[123, 456]
+
+        Set detailed=true for the same listing with hardware, software and system details
+        (equivalent to get_devices_detailed).
         """
 
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                # Legacy parameters (maintained for backward compatibility)
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs (legacy parameter, use for backward compatibility)"
-                },
-                "device_filter": {
-                    "type": "string",
-                    "description": "Raw device filter string (advanced users). If provided, other filter parameters are ignored."
-                },
-                "node_class_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by node class IDs (legacy parameter)"
-                },
-                "node_role_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by node role IDs (legacy parameter)"
-                },
-
-                # Enhanced filtering parameters
-                "online_status": {
-                    "type": "string",
-                    "enum": ["online", "offline"],
-                    "description": "Filter by device online/offline status"
-                },
-                "approval_status": {
-                    "type": "string",
-                    "enum": ["PENDING", "APPROVED"],
-                    "description": "Filter by device approval status"
-                },
-                "device_classes": {
-                    "type": "array",
-                    "items": {
-                        "type": "string",
-                        "enum": [
-                            "WINDOWS_SERVER", "WINDOWS_WORKSTATION", "LINUX_WORKSTATION", "MAC",
-                            "VMWARE_VM_HOST", "VMWARE_VM_GUEST", "LINUX_SERVER", "MAC_SERVER",
-                            "CLOUD_MONITOR_TARGET", "NMS_SWITCH", "NMS_ROUTER", "NMS_FIREWALL",
-                            "NMS_PRIVATE_NETWORK_GATEWAY", "NMS_PRINTER", "NMS_SCANNER",
-                            "NMS_DIAL_MANAGER", "NMS_WAP", "NMS_IPSLA", "NMS_COMPUTER",
-                            "NMS_VM_HOST", "NMS_APPLIANCE", "NMS_OTHER", "NMS_SERVER",
-                            "NMS_PHONE", "NMS_VIRTUAL_MACHINE", "NMS_NETWORK_MANAGEMENT_AGENT"
-                        ]
-                    },
-                    "description": "Filter by device classes (e.g., ['WINDOWS_SERVER', 'LINUX_SERVER'])"
-                },
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by specific device IDs"
-                },
-                "location_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by location IDs"
-                },
-                "role_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by device role IDs"
-                },
-                "group_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by group membership (devices in these groups)"
-                },
-                "created_after": {
-                    "type": "string",
-                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
-                    "description": "Filter devices created after this date (YYYY-MM-DD format)"
-                },
-                "created_before": {
-                    "type": "string",
-                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
-                    "description": "Filter devices created before this date (YYYY-MM-DD format)"
-                },
-
-                # Exclusion filters
-                "exclude_organizations": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices from these organization IDs"
-                },
-                "exclude_locations": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices from these location IDs"
-                },
-                "exclude_roles": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices with these role IDs"
-                },
-
-                # Pagination
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of devices to return (max 1000)"
-                }
-            },
-            "required": []
-        }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            **_DEVICE_LISTING_PROPERTIES,
+            "detailed": {
+                "type": "boolean",
+                "default": False,
+                "description": "Return detailed device information (hardware, software, system details)"
+            }
+        },
+        "required": []
+    })
     
+    @tool_error_boundary(_device_listing_action)
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
-        """Execute get devices with enhanced filtering."""
-        try:
-            # Build query parameters
-            params = {}
-
-            # Handle pagination parameters
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
-
-            # Handle device filter - if raw device_filter is provided, use it directly
-            if arguments.get("device_filter"):
-                params["df"] = arguments["device_filter"]
-            else:
-                # Build filter from individual parameters
-                filter_params = {
-                    "organization_ids": arguments.get("organization_ids"),
-                    "exclude_organizations": arguments.get("exclude_organizations"),
-                    "location_ids": arguments.get("location_ids"),
-                    "exclude_locations": arguments.get("exclude_locations"),
-                    "role_ids": arguments.get("role_ids") or arguments.get("node_role_ids"),  # Support legacy parameter
-                    "exclude_roles": arguments.get("exclude_roles"),
-                    "device_ids": arguments.get("device_ids"),
-                    "device_classes": arguments.get("device_classes"),
-                    "approval_status": arguments.get("approval_status"),
-                    "online_status": arguments.get("online_status"),
-                    "created_after": arguments.get("created_after"),
-                    "created_before": arguments.get("created_before"),
-                    "group_ids": arguments.get("group_ids")
-                }
-
-                # Remove None values
-                filter_params = {k: v for k, v in filter_params.items() if v is not None}
-
-                if filter_params:
-                    device_filter = DeviceFilterBuilder.from_parameters(**filter_params)
-                    if device_filter:
-                        params["df"] = device_filter
-
-            # Handle legacy parameters for backward compatibility
-            if arguments.get("organization_ids") and not params.get("df"):
-                params["organizationIds"] = ",".join(map(str, arguments["organization_ids"]))
-
-            if arguments.get("node_class_ids"):
-                params["nodeClassIds"] = ",".join(map(str, arguments["node_class_ids"]))
-
-            if arguments.get("node_role_ids") and not arguments.get("role_ids"):
-                params["nodeRoleIds"] = ",".join(map(str, arguments["node_role_ids"]))
+        """Execute get devices (basic or detailed) with enhanced filtering."""
+        detailed = self.DETAILED or bool(arguments.get("detailed"))
+        # Build query parameters
+        params = {}
+
+        # Handle pagination parameters
+        if arguments.get("cursor"):
+            params["cursor"] = arguments["cursor"]
+        if arguments.get("page_size"):
+            params["pageSize"] = arguments["page_size"]
+
+        # Add detailed information flags
+        if detailed:
+            params["detailed"] = "true"
 
+        # Handle device filter - if raw device_filter is provided, use it directly
+        if arguments.get("device_filter"):
+            params["df"] = arguments["device_filter"]
+        else:
+            # Build filter from individual parameters
+            filter_params = _filter_params(arguments)
+
+            if filter_params:
+                device_filter = build_filter(**filter_params)
+                if device_filter:
+                    params["df"] = device_filter
+
+        # Handle legacy parameters for backward compatibility. nodeClassIds is always
+        # sent (node class IDs have no df equivalent). node_role_ids goes into a built
+        # df as role_ids, so nodeRoleIds is only sent alongside a raw device_filter.
+        # organization_ids is never sent separately: it is part of a built df, and is
+        # ignored when a raw device_filter is given
+        if arguments.get("node_class_ids"):
+            params["nodeClassIds"] = join_ids(arguments["node_class_ids"])
+
+        if arguments.get("device_filter") and arguments.get("node_role_ids") and not arguments.get("role_ids"):
+            params["nodeRoleIds"] = join_ids(arguments["node_role_ids"])
+
+        if detailed:
+            result = await self.client.get("/devices-detailed", "get_devices_detailed", params=params)
+        else:
             result = await self.client.get("/devices", "get_devices", params=params)
+        result = _select_fields(result, arguments.get("fields"))
 
+        if arguments.get("per_device") and isinstance(result, list) and result:
+            # Many small documents instead of one multi-megabyte string
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
+                text=self._serialize(device)
+            ) for device in result]
 
-        except Exception as e:
-            return [TextContent(
-                type="text",
-                text=f"Error getting devices: {str(e)}"
-            )]
+        return [TextContent(
+            type="text",
+            text=self._serialize(result)
+        )]
 
 
-class GetDevicesDetailedTool(BaseTool):
-    """Tool to get detailed device information."""
+class GetDevicesDetailedTool(GetDevicesTool):
+    """Tool to get detailed device information; get_devices with detailed=true under its own name."""
+    
+    __slots__ = ()
     
-    @property
-    def name(self) -> str:
-        return "get_devices_detailed"
+    DETAILED = True
     
-    @property
-    def description(self) -> str:
-        return """Get comprehensive device information with advanced filtering capabilities.
+    name = "get_devices_detailed"
+    description = """Get comprehensive device information with advanced filtering capabilities.
 
         Returns detailed device information including hardware specs, software, and system details.
         Supports the same comprehensive filtering as get_devices:
@@ -289,233 +338,47 @@ class GetDevicesDetailedTool(BaseTool):
         - Get detailed info for online Windows servers: online_status="online", device_classes=["WINDOWS_SERVER"]
         - Get detailed info for devices in specific groups: group_ids=[123, 456]
         - Get detailed info excluding certain orgs: exclude_organizations=[789]
-        """
-
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                # Legacy parameters (maintained for backward compatibility)
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs (legacy parameter, use for backward compatibility)"
-                },
-                "device_filter": {
-                    "type": "string",
-                    "description": "Raw device filter string (advanced users). If provided, other filter parameters are ignored."
-                },
-                "node_class_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by node class IDs (legacy parameter)"
-                },
-                "node_role_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by node role IDs (legacy parameter)"
-                },
-
-                # Enhanced filtering parameters
-                "online_status": {
-                    "type": "string",
-                    "enum": ["online", "offline"],
-                    "description": "Filter by device online/offline status"
-                },
-                "approval_status": {
-                    "type": "string",
-                    "enum": ["PENDING", "APPROVED"],
-                    "description": "Filter by device approval status"
-                },
-                "device_classes": {
-                    "type": "array",
-                    "items": {
-                        "type": "string",
-                        "enum": [
-                            "WINDOWS_SERVER", "WINDOWS_WORKSTATION", "LINUX_WORKSTATION", "MAC",
-                            "VMWARE_VM_HOST", "VMWARE_VM_GUEST", "LINUX_SERVER", "MAC_SERVER",
-                            "CLOUD_MONITOR_TARGET", "NMS_SWITCH", "NMS_ROUTER", "NMS_FIREWALL",
-                            "NMS_PRIVATE_NETWORK_GATEWAY", "NMS_PRINTER", "NMS_SCANNER",
-                            "NMS_DIAL_MANAGER", "NMS_WAP", "NMS_IPSLA", "NMS_COMPUTER",
-                            "NMS_VM_HOST", "NMS_APPLIANCE", "NMS_OTHER", "NMS_SERVER",
-                            "NMS_PHONE", "NMS_VIRTUAL_MACHINE", "NMS_NETWORK_MANAGEMENT_AGENT"
-                        ]
-                    },
-                    "description": "Filter by device classes (e.g., ['WINDOWS_SERVER', 'LINUX_SERVER'])"
-                },
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by specific device IDs"
-                },
-                "location_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by location IDs"
-                },
-                "role_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by device role IDs"
-                },
-                "group_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by group membership (devices in these groups)"
-                },
-                "created_after": {
-                    "type": "string",
-                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
-                    "description": "Filter devices created after this date (YYYY-MM-DD format)"
-                },
-                "created_before": {
-                    "type": "string",
-                    "pattern": "^\\d{4}-\\d{2}-\\d{2}$",
-                    "description": "Filter devices created before this date (YYYY-MM-DD format)"
-                },
-
-                # Exclusion filters
-                "exclude_organizations": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices from these organization IDs"
-                },
-                "exclude_locations": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices from these location IDs"
-                },
-                "exclude_roles": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Exclude devices with these role IDs"
-                },
-
-                # Pagination
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of devices to return (max 1000)"
-                }
-            },
-            "required": []
-        }
-    
-    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
-        """Execute get devices detailed with enhanced filtering."""
-        try:
-            # Build query parameters
-            params = {}
-
-            # Handle pagination parameters
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
-
-            # Add detailed information flags
-            params["detailed"] = "true"
-
-            # Handle device filter - if raw device_filter is provided, use it directly
-            if arguments.get("device_filter"):
-                params["df"] = arguments["device_filter"]
-            else:
-                # Build filter from individual parameters
-                filter_params = {
-                    "organization_ids": arguments.get("organization_ids"),
-                    "exclude_organizations": arguments.get("exclude_organizations"),
-                    "location_ids": arguments.get("location_ids"),
-                    "exclude_locations": arguments.get("exclude_locations"),
-                    "role_ids": arguments.get("role_ids") or arguments.get("node_role_ids"),  # Support legacy parameter
-                    "exclude_roles": arguments.get("exclude_roles"),
-                    "device_ids": arguments.get("device_ids"),
-                    "device_classes": arguments.get("device_classes"),
-                    "approval_status": arguments.get("approval_status"),
-                    "online_status": arguments.get("online_status"),
-                    "created_after": arguments.get("created_after"),
-                    "created_before": arguments.get("created_before"),
-                    "group_ids": arguments.get("group_ids")
-                }
-
-                # Remove None values
-                filter_params = {k: v for k, v in filter_params.items() if v is not None}
-
-                if filter_params:
-                    device_filter = DeviceFilterBuilder.from_parameters(**filter_params)
-                    if device_filter:
-                        params["df"] = device_filter
-
-            # Handle legacy parameters for backward compatibility
-            if arguments.get("organization_ids") and not params.get("df"):
-                params["organizationIds"] = ",".join(map(str, arguments["organization_ids"]))
-
-            if arguments.get("node_class_ids"):
-                params["nodeClassIds"] = ",".join(map(str, arguments["node_class_ids"]))
-
-            if arguments.get("node_role_ids") and not arguments.get("role_ids"):
-                params["nodeRoleIds"] = ",".join(map(str, arguments["node_role_ids"]))
+        - Get only names and OS details: fields=["id", "systemName", "os"]
 
-            result = await self.client.get("/devices-detailed", "get_devices_detailed", params=params)
-
-            return [TextContent(
-                type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
+        With per_device=true the result is one JSON object per text block, one block per device.
+        """
 
-        except Exception as e:
-            return [TextContent(
-                type="text",
-                text=f"Error getting detailed devices: {str(e)}"
-            )]
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": _DEVICE_LISTING_PROPERTIES,
+        "required": []
+    })
 
 
 class GetDeviceDetailsTool(BaseTool):
     """Tool to get detailed information about a specific device."""
     
-    @property
-    def name(self) -> str:
-        return "get_device_details"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get detailed information about a specific device by ID"
+    name = "get_device_details"
+    description = "Get detailed information about a specific device by ID"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "device_id": {
-                    "type": "integer",
-                    "description": "The ID of the device to get details for"
-                }
-            },
-            "required": ["device_id"]
-        }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "device_id": {
+                "type": "integer",
+                "description": "The ID of the device to get details for"
+            }
+        },
+        "required": ["device_id"]
+    })
     
+    @tool_error_boundary("getting device details")
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get device details."""
-        try:
-            device_id = arguments["device_id"]
-            result = await self.client.get(f"/device/{device_id}", "get_device_details")
-            
-            return [TextContent(
-                type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
-            
-        except Exception as e:
-            return [TextContent(
-                type="text",
-                text=f"Error getting device details: {str(e)}"
-            )]
+        device_id = arguments["device_id"]
+        result = await self.client.get(f"/device/{device_id}", "get_device_details")
+        
+        return [TextContent(
+            type="text",
+            text=self._serialize(result)
+        )]
 
 
 class DeviceTools:
@@ -1,220 +1,223 @@
 """Script execution tools for NinjaRMM MCP Server."""
 
+import asyncio
+from types import MappingProxyType
 from typing import Dict, Any, List
 from mcp.types import TextContent
 
-from .base import BaseTool
+from ..utils.ids import join_ids
+from .base import MAX_ID_LIST, BaseTool, tool_error_boundary
+
+# Larger run_script device lists are submitted in chunks of this size, a few at a time
+RUN_SCRIPT_CHUNK_SIZE = 50
+RUN_SCRIPT_CONCURRENCY = 8
 
 
 class GetAutomationScriptsTool(BaseTool):
     """Tool to get available automation scripts."""
     
-    @property
-    def name(self) -> str:
-        return "get_automation_scripts"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get available automation scripts with optional filtering"
+    name = "get_automation_scripts"
+    description = "Get available automation scripts with optional filtering"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs"
-                },
-                "script_type": {
-                    "type": "string",
-                    "description": "Filter by script type (e.g., 'POWERSHELL', 'BATCH', 'BASH')"
-                },
-                "category": {
-                    "type": "string",
-                    "description": "Filter by script category"
-                },
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of scripts to return (max 1000)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "organization_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by organization IDs"
             },
-            "required": []
-        }
+            "script_type": {
+                "type": "string",
+                "description": "Filter by script type (e.g., 'POWERSHELL', 'BATCH', 'BASH')"
+            },
+            "category": {
+                "type": "string",
+                "description": "Filter by script category"
+            },
+            "cursor": {
+                "type": "string",
+                "description": "Pagination cursor for next page"
+            },
+            "page_size": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 1000,
+                "default": 1000,
+                "description": "Number of scripts to return (max 1000)"
+            }
+        },
+        "required": []
+    })
     
+    @tool_error_boundary("getting automation scripts")
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get automation scripts."""
-        try:
-            # Build query parameters
-            params = {}
-            
-            if arguments.get("organization_ids"):
-                params["organizationIds"] = ",".join(map(str, arguments["organization_ids"]))
-            
-            if arguments.get("script_type"):
-                params["scriptType"] = arguments["script_type"]
-            
-            if arguments.get("category"):
-                params["category"] = arguments["category"]
-            
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
-            
-            result = await self.client.get("/automation/scripts", "get_automation_scripts", params=params)
-            
-            return [TextContent(
-                type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
-            
-        except Exception as e:
-            return [TextContent(
-                type="text",
-                text=f"Error getting automation scripts: {str(e)}"
-            )]
+        # Build query parameters
+        params = {}
+        
+        if arguments.get("organization_ids"):
+            params["organizationIds"] = join_ids(arguments["organization_ids"])
+        
+        if arguments.get("script_type"):
+            params["scriptType"] = arguments["script_type"]
+        
+        if arguments.get("category"):
+            params["category"] = arguments["category"]
+        
+        if arguments.get("cursor"):
+            params["cursor"] = arguments["cursor"]
+        
+        if arguments.get("page_size"):
+            params["pageSize"] = arguments["page_size"]
+        
+        result = await self.client.get("/automation/scripts", "get_automation_scripts", params=params)
+        
+        return [TextContent(
+            type="text",
+            text=self._serialize(result)
+        )]
 
 
 class RunScriptTool(BaseTool):
     """Tool to execute automation scripts on devices."""
     
-    @property
-    def name(self) -> str:
-        return "run_script"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Execute automation scripts on specified devices"
+    name = "run_script"
+    description = "Execute automation scripts on specified devices"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "script_id": {
-                    "type": "integer",
-                    "description": "The ID of the script to execute"
-                },
-                "device_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Device IDs to run the script on"
-                },
-                "parameters": {
-                    "type": "object",
-                    "description": "Script parameters as key-value pairs"
-                },
-                "run_as": {
-                    "type": "string",
-                    "description": "User context to run the script as (optional)"
-                },
-                "timeout": {
-                    "type": "integer",
-                    "minimum": 60,
-                    "maximum": 3600,
-                    "default": 300,
-                    "description": "Script execution timeout in seconds (60-3600)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "script_id": {
+                "type": "integer",
+                "description": "The ID of the script to execute"
             },
-            "required": ["script_id", "device_ids"]
-        }
+            "device_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "maxItems": MAX_ID_LIST,
+                "description": "Device IDs to run the script on"
+            },
+            "parameters": {
+                "type": "object",
+                "description": "Script parameters as key-value pairs"
+            },
+            "run_as": {
+                "type": "string",
+                "description": "User context to run the script as (optional)"
+            },
+            "timeout": {
+                "type": "integer",
+                "minimum": 60,
+                "maximum": 3600,
+                "default": 300,
+                "description": "Script execution timeout in seconds (60-3600)"
+            }
+        },
+        "required": ["script_id", "device_ids"]
+    })
     
+    @tool_error_boundary("running script")
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute run script."""
-        try:
-            script_id = arguments["script_id"]
-            device_ids = arguments["device_ids"]
-            parameters = arguments.get("parameters", {})
-            run_as = arguments.get("run_as")
-            timeout = arguments.get("timeout", 300)
-            
-            # Prepare request data
-            data = {
-                "scriptId": script_id,
-                "deviceIds": device_ids,
-                "timeout": timeout
-            }
-            
-            if parameters:
-                data["parameters"] = parameters
-            
-            if run_as:
-                data["runAs"] = run_as
-            
+        script_id = arguments["script_id"]
+        device_ids = arguments["device_ids"]
+        parameters = arguments.get("parameters", {})
+        run_as = arguments.get("run_as")
+        timeout = arguments.get("timeout", 300)
+        
+        # Prepare request data in one literal; optional fields only when set
+        data = {
+            "scriptId": script_id,
+            "deviceIds": device_ids,
+            "timeout": timeout,
+            **({"parameters": parameters} if parameters else {}),
+            **({"runAs": run_as} if run_as else {}),
+        }
+        
+        if len(device_ids) > RUN_SCRIPT_CHUNK_SIZE:
+            result = await self._run_in_chunks(data, device_ids)
+        else:
             result = await self.client.post("/automation/scripts/run", "run_script", data=data)
-            
-            return [TextContent(
-                type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
-            
-        except Exception as e:
-            return [TextContent(
-                type="text",
-                text=f"Error running script: {str(e)}"
-            )]
+        
+        return [TextContent(
+            type="text",
+            text=self._serialize(result)
+        )]
+    
+    async def _run_in_chunks(self, data: Dict[str, Any], device_ids: List[int]) -> List[Any]:
+        """Submit the script for chunks of devices concurrently and merge the responses.
+        
+        A failed chunk doesn't stop the others (they may already be running); it is
+        reported in place as an error entry naming its devices.
+        """
+        semaphore = asyncio.Semaphore(RUN_SCRIPT_CONCURRENCY)
+        chunks = [
+            device_ids[start:start + RUN_SCRIPT_CHUNK_SIZE]
+            for start in range(0, len(device_ids), RUN_SCRIPT_CHUNK_SIZE)
+        ]
+        
+        async def run_chunk(chunk: List[int]) -> Any:
+            async with semaphore:
+                return await self.client.post(
+                    "/automation/scripts/run", "run_script", data={**data, "deviceIds": chunk}
+                )
+        
+        responses = await asyncio.gather(*map(run_chunk, chunks), return_exceptions=True)
+        merged: List[Any] = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                merged.append({"deviceIds": chunk, "error": str(response)})
+            elif isinstance(response, list):
+                merged.extend(response)
+            else:
+                merged.append(response)
+        return merged
 
 
 class GetDeviceScriptingOptionsTool(BaseTool):
     """Tool to get available scripting options (built-in actions, custom scripts) for a specific device."""
+    
+    __slots__ = ()
+
+    name = "get_device_scripting_options"
+    description = "Retrieve available scripting options (built-in actions, custom scripts) for a specific device"
 
-    @property
-    def name(self) -> str:
-        return "get_device_scripting_options"
-
-    @property
-    def description(self) -> str:
-        return "Retrieve available scripting options (built-in actions, custom scripts) for a specific device"
-
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "device_id": {
-                    "type": "integer",
-                    "description": "Device identifier"
-                },
-                "lang": {
-                    "type": "string",
-                    "description": "Language tag (optional)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "device_id": {
+                "type": "integer",
+                "description": "Device identifier"
             },
-            "required": ["device_id"]
-        }
+            "lang": {
+                "type": "string",
+                "description": "Language tag (optional)"
+            }
+        },
+        "required": ["device_id"]
+    })
 
+    @tool_error_boundary("getting device scripting options")
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get device scripting options."""
-        try:
-            device_id = arguments["device_id"]
-
-            # Build query parameters
-            params = {}
-            if arguments.get("lang"):
-                params["lang"] = arguments["lang"]
-
-            result = await self.client.get(f"/device/{device_id}/scripting/options", "get_device_scripting_options", params=params)
-
-            return [TextContent(
-                type="text",
-                text=self.client._safe_json_stringify(result)
-            )]
-
-        except Exception as e:
-            return [TextContent(
-                type="text",
-                text=f"Error getting device scripting options: {str(e)}"
-            )]
+        device_id = arguments["device_id"]
+
+        # Build query parameters
+        params = {}
+        if arguments.get("lang"):
+            params["lang"] = arguments["lang"]
+
+        result = await self.client.get(f"/device/{device_id}/scripting/options", "get_device_scripting_options", params=params)
+
+        return [TextContent(
+            type="text",
+            text=self._serialize(result)
+        )]
 
 
 class ScriptTools:
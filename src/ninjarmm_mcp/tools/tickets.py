@@ -1,29 +1,40 @@
 """Ticketing system tools for NinjaRMM MCP Server."""
 
+import asyncio
+from types import MappingProxyType
 from typing import Dict, Any, List
 from mcp.types import TextContent
 
-from .base import BaseTool
+from ..utils.ids import join_ids
+from .base import BaseTool, QueryParamMap, build_query
+
+# Ticket details fetched concurrently by one get_ticket_details_batch call
+TICKET_DETAILS_CONCURRENCY = 16
+
+# Most tickets one get_ticket_details_batch call accepts
+MAX_TICKET_BATCH = 100
+
+# A ticket listing cursor carries the filters of the query that produced it, so
+# follow-up pages send only the cursor (and page size) instead of every filter again
+CURSOR_PAGE_PARAMS: QueryParamMap = (
+    ("cursor", "cursor", None),
+    ("page_size", "pageSize", None),
+)
 
 
 class GetTicketBoardsTool(BaseTool):
     """Tool to get ticket boards."""
     
-    @property
-    def name(self) -> str:
-        return "get_ticket_boards"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get all available ticket boards"
+    name = "get_ticket_boards"
+    description = "Get all available ticket boards"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {},
-            "required": []
-        }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {},
+        "required": []
+    })
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get ticket boards."""
@@ -32,7 +43,7 @@ class GetTicketBoardsTool(BaseTool):
             
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
             
         except Exception as e:
@@ -45,88 +56,77 @@ class GetTicketBoardsTool(BaseTool):
 class GetMyTicketsTool(BaseTool):
     """Tool to get tickets assigned to the current user."""
     
-    @property
-    def name(self) -> str:
-        return "get_my_tickets"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get tickets assigned to the current user with optional filtering"
+    name = "get_my_tickets"
+    description = "Get tickets assigned to the current user with optional filtering"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "board_id": {
-                    "type": "integer",
-                    "description": "Filter by ticket board ID"
-                },
-                "status": {
-                    "type": "string",
-                    "description": "Filter by ticket status (e.g., 'OPEN', 'IN_PROGRESS', 'RESOLVED')"
-                },
-                "priority": {
-                    "type": "string",
-                    "description": "Filter by priority (e.g., 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')"
-                },
-                "since": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get tickets since this timestamp (ISO format)"
-                },
-                "until": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get tickets until this timestamp (ISO format)"
-                },
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of tickets to return (max 1000)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "board_id": {
+                "type": "integer",
+                "description": "Filter by ticket board ID"
+            },
+            "status": {
+                "type": "string",
+                "description": "Filter by ticket status (e.g., 'OPEN', 'IN_PROGRESS', 'RESOLVED')"
+            },
+            "priority": {
+                "type": "string",
+                "description": "Filter by priority (e.g., 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')"
             },
-            "required": []
-        }
+            "since": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get tickets since this timestamp (ISO format)"
+            },
+            "until": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get tickets until this timestamp (ISO format)"
+            },
+            "cursor": {
+                "type": "string",
+                "description": "Pagination cursor for next page (keeps the filters of the query that returned it)"
+            },
+            "page_size": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 1000,
+                "default": 1000,
+                "description": "Number of tickets to return (max 1000)"
+            }
+        },
+        "required": []
+    })
+    
+    # Fixed query parameters scoping every request (and page) of this tool
+    BASE_PARAMS = MappingProxyType({"assignedToMe": "true"})
+    
+    # Arguments forwarded as query parameters, in the order they are applied
+    QUERY_PARAMS: QueryParamMap = (
+        ("board_id", "boardId", None),
+        ("status", "status", None),
+        ("priority", "priority", None),
+        ("since", "since", None),
+        ("until", "until", None),
+        ("cursor", "cursor", None),
+        ("page_size", "pageSize", None),
+    )
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get my tickets."""
         try:
-            # Build query parameters
-            params = {"assignedToMe": "true"}
-            
-            if arguments.get("board_id"):
-                params["boardId"] = arguments["board_id"]
-            
-            if arguments.get("status"):
-                params["status"] = arguments["status"]
-            
-            if arguments.get("priority"):
-                params["priority"] = arguments["priority"]
-            
-            if arguments.get("since"):
-                params["since"] = arguments["since"]
-            
-            if arguments.get("until"):
-                params["until"] = arguments["until"]
-            
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
+            # Build query parameters; a cursor already encodes the filters
+            param_map = CURSOR_PAGE_PARAMS if arguments.get("cursor") else self.QUERY_PARAMS
+            params = {**self.BASE_PARAMS, **build_query(arguments, param_map)}
             
             result = await self.client.get("/ticketing/tickets", "get_my_tickets", params=params)
             
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
             
         except Exception as e:
@@ -139,81 +139,72 @@ class GetMyTicketsTool(BaseTool):
 class GetUnassignedTicketsTool(BaseTool):
     """Tool to get unassigned tickets for quick triage."""
     
-    @property
-    def name(self) -> str:
-        return "get_unassigned_tickets"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get unassigned tickets for quick triage with optional filtering"
+    name = "get_unassigned_tickets"
+    description = "Get unassigned tickets for quick triage with optional filtering"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "board_id": {
-                    "type": "integer",
-                    "description": "Filter by ticket board ID"
-                },
-                "priority": {
-                    "type": "string",
-                    "description": "Filter by priority (e.g., 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')"
-                },
-                "organization_ids": {
-                    "type": "array",
-                    "items": {"type": "integer"},
-                    "description": "Filter by organization IDs"
-                },
-                "since": {
-                    "type": "string",
-                    "format": "date-time",
-                    "description": "Get tickets since this timestamp (ISO format)"
-                },
-                "cursor": {
-                    "type": "string",
-                    "description": "Pagination cursor for next page"
-                },
-                "page_size": {
-                    "type": "integer",
-                    "minimum": 1,
-                    "maximum": 1000,
-                    "default": 1000,
-                    "description": "Number of tickets to return (max 1000)"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "board_id": {
+                "type": "integer",
+                "description": "Filter by ticket board ID"
+            },
+            "priority": {
+                "type": "string",
+                "description": "Filter by priority (e.g., 'LOW', 'MEDIUM', 'HIGH', 'CRITICAL')"
             },
-            "required": []
-        }
+            "organization_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "description": "Filter by organization IDs"
+            },
+            "since": {
+                "type": "string",
+                "format": "date-time",
+                "description": "Get tickets since this timestamp (ISO format)"
+            },
+            "cursor": {
+                "type": "string",
+                "description": "Pagination cursor for next page (keeps the filters of the query that returned it)"
+            },
+            "page_size": {
+                "type": "integer",
+                "minimum": 1,
+                "maximum": 1000,
+                "default": 1000,
+                "description": "Number of tickets to return (max 1000)"
+            }
+        },
+        "required": []
+    })
+    
+    # Fixed query parameters scoping every request (and page) of this tool
+    BASE_PARAMS = MappingProxyType({"unassigned": "true"})
+    
+    # Arguments forwarded as query parameters, in the order they are applied
+    QUERY_PARAMS: QueryParamMap = (
+        ("board_id", "boardId", None),
+        ("priority", "priority", None),
+        ("organization_ids", "organizationIds", join_ids),
+        ("since", "since", None),
+        ("cursor", "cursor", None),
+        ("page_size", "pageSize", None),
+    )
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get unassigned tickets."""
         try:
-            # Build query parameters
-            params = {"unassigned": "true"}
-            
-            if arguments.get("board_id"):
-                params["boardId"] = arguments["board_id"]
-            
-            if arguments.get("priority"):
-                params["priority"] = arguments["priority"]
-            
-            if arguments.get("organization_ids"):
-                params["organizationIds"] = ",".join(map(str, arguments["organization_ids"]))
-            
-            if arguments.get("since"):
-                params["since"] = arguments["since"]
-            
-            if arguments.get("cursor"):
-                params["cursor"] = arguments["cursor"]
-            
-            if arguments.get("page_size"):
-                params["pageSize"] = arguments["page_size"]
+            # Build query parameters; a cursor already encodes the filters
+            param_map = CURSOR_PAGE_PARAMS if arguments.get("cursor") else self.QUERY_PARAMS
+            params = {**self.BASE_PARAMS, **build_query(arguments, param_map)}
             
             result = await self.client.get("/ticketing/tickets", "get_unassigned_tickets", params=params)
             
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
             
         except Exception as e:
@@ -226,36 +217,31 @@ class GetUnassignedTicketsTool(BaseTool):
 class GetTicketDetailsTool(BaseTool):
     """Tool to get detailed ticket information including notes and history."""
     
-    @property
-    def name(self) -> str:
-        return "get_ticket_details"
+    __slots__ = ()
     
-    @property
-    def description(self) -> str:
-        return "Get detailed information about a specific ticket including notes, history, and attachments"
+    name = "get_ticket_details"
+    description = "Get detailed information about a specific ticket including notes, history, and attachments"
     
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "ticket_id": {
-                    "type": "integer",
-                    "description": "The ID of the ticket to get details for"
-                },
-                "include_comments": {
-                    "type": "boolean",
-                    "default": True,
-                    "description": "Include ticket comments/notes in the response"
-                },
-                "include_history": {
-                    "type": "boolean",
-                    "default": True,
-                    "description": "Include ticket history in the response"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "ticket_id": {
+                "type": "integer",
+                "description": "The ID of the ticket to get details for"
             },
-            "required": ["ticket_id"]
-        }
+            "include_comments": {
+                "type": "boolean",
+                "default": True,
+                "description": "Include ticket comments/notes in the response"
+            },
+            "include_history": {
+                "type": "boolean",
+                "default": True,
+                "description": "Include ticket history in the response"
+            }
+        },
+        "required": ["ticket_id"]
+    })
     
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute get ticket details."""
@@ -275,7 +261,77 @@ class GetTicketDetailsTool(BaseTool):
             
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
+            )]
+            
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error getting ticket details: {str(e)}"
+            )]
+
+
+class BatchGetTicketDetailsTool(BaseTool):
+    """Tool to get detailed information for several tickets in one call."""
+    
+    __slots__ = ()
+    
+    name = "get_ticket_details_batch"
+    description = "Get detailed information about several tickets at once (e.g. the top results of get_my_tickets), fetched concurrently"
+    
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "ticket_ids": {
+                "type": "array",
+                "items": {"type": "integer"},
+                "minItems": 1,
+                "maxItems": MAX_TICKET_BATCH,
+                "description": f"The IDs of the tickets to get details for (max {MAX_TICKET_BATCH})"
+            },
+            "include_comments": {
+                "type": "boolean",
+                "default": True,
+                "description": "Include ticket comments/notes in the response"
+            },
+            "include_history": {
+                "type": "boolean",
+                "default": True,
+                "description": "Include ticket history in the response"
+            }
+        },
+        "required": ["ticket_ids"]
+    })
+    
+    async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Execute get ticket details for a batch of tickets."""
+        try:
+            ticket_ids = arguments["ticket_ids"]
+            # Build query parameters, shared by every request
+            params = {}
+            if arguments.get("include_comments", True):
+                params["includeComments"] = "true"
+            if arguments.get("include_history", True):
+                params["includeHistory"] = "true"
+            
+            semaphore = asyncio.Semaphore(TICKET_DETAILS_CONCURRENCY)
+            
+            async def get_details(ticket_id: int) -> Any:
+                async with semaphore:
+                    return await self.client.get(
+                        f"/ticketing/tickets/{ticket_id}", "get_ticket_details", params=params
+                    )
+            
+            # One failed ticket doesn't fail the batch; it is reported in place
+            responses = await asyncio.gather(*map(get_details, ticket_ids), return_exceptions=True)
+            result = [
+                {"ticketId": ticket_id, "error": str(response)} if isinstance(response, Exception) else response
+                for ticket_id, response in zip(ticket_ids, responses)
+            ]
+            
+            return [TextContent(
+                type="text",
+                text=self._serialize(result)
             )]
             
         except Exception as e:
@@ -287,77 +343,66 @@ class GetTicketDetailsTool(BaseTool):
 
 class UpdateTicketStatusTool(BaseTool):
     """Tool to update ticket status with proper validation."""
+    
+    __slots__ = ()
 
-    @property
-    def name(self) -> str:
-        return "update_ticket_status"
-
-    @property
-    def description(self) -> str:
-        return "Update ticket status with proper validation and optional notes"
-
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "ticket_id": {
-                    "type": "integer",
-                    "description": "The ID of the ticket to update"
-                },
-                "status": {
-                    "type": "string",
-                    "description": "New status for the ticket (e.g., 'OPEN', 'IN_PROGRESS', 'RESOLVED', 'CLOSED')"
-                },
-                "assigned_to": {
-                    "type": "string",
-                    "description": "User to assign the ticket to (optional)"
-                },
-                "priority": {
-                    "type": "string",
-                    "description": "New priority for the ticket (optional)"
-                },
-                "note": {
-                    "type": "string",
-                    "description": "Optional note to add when updating status"
-                },
-                "is_public_note": {
-                    "type": "boolean",
-                    "default": True,
-                    "description": "Whether the note should be public (visible to customer)"
-                }
+    name = "update_ticket_status"
+    description = "Update ticket status with proper validation and optional notes"
+
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "ticket_id": {
+                "type": "integer",
+                "description": "The ID of the ticket to update"
+            },
+            "status": {
+                "type": "string",
+                "description": "New status for the ticket (e.g., 'OPEN', 'IN_PROGRESS', 'RESOLVED', 'CLOSED')"
             },
-            "required": ["ticket_id", "status"]
-        }
+            "assigned_to": {
+                "type": "string",
+                "description": "User to assign the ticket to (optional)"
+            },
+            "priority": {
+                "type": "string",
+                "description": "New priority for the ticket (optional)"
+            },
+            "note": {
+                "type": "string",
+                "description": "Optional note to add when updating status"
+            },
+            "is_public_note": {
+                "type": "boolean",
+                "default": True,
+                "description": "Whether the note should be public (visible to customer)"
+            }
+        },
+        "required": ["ticket_id", "status"]
+    })
+
+    # Optional arguments copied into the request body when set
+    BODY_FIELDS: QueryParamMap = (
+        ("assigned_to", "assignedTo", None),
+        ("priority", "priority", None),
+        ("note", "note", None),
+    )
 
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute update ticket status."""
         try:
             ticket_id = arguments["ticket_id"]
-            status = arguments["status"]
-            assigned_to = arguments.get("assigned_to")
-            priority = arguments.get("priority")
-            note = arguments.get("note")
-            is_public_note = arguments.get("is_public_note", True)
 
-            # Prepare request data
-            data = {"status": status}
-
-            if assigned_to:
-                data["assignedTo"] = assigned_to
-
-            if priority:
-                data["priority"] = priority
-
-            if note:
-                data["note"] = note
-                data["isPublicNote"] = is_public_note
+            # Prepare request data; a note carries its visibility with it
+            data = {"status": arguments["status"], **build_query(arguments, self.BODY_FIELDS)}
+            if "note" in data:
+                data["isPublicNote"] = arguments.get("is_public_note", True)
 
             result = await self.client.patch(f"/ticketing/tickets/{ticket_id}", "update_ticket_status", data=data)
 
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
 
         except Exception as e:
@@ -369,71 +414,62 @@ class UpdateTicketStatusTool(BaseTool):
 
 class AddTicketNoteTool(BaseTool):
     """Tool to add public or private notes to tickets with time tracking."""
+    
+    __slots__ = ()
+
+    name = "add_ticket_note"
+    description = "Add public or private notes to tickets with optional time tracking"
 
-    @property
-    def name(self) -> str:
-        return "add_ticket_note"
-
-    @property
-    def description(self) -> str:
-        return "Add public or private notes to tickets with optional time tracking"
-
-    @property
-    def input_schema(self) -> Dict[str, Any]:
-        return {
-            "type": "object",
-            "properties": {
-                "ticket_id": {
-                    "type": "integer",
-                    "description": "The ID of the ticket to add a note to"
-                },
-                "content": {
-                    "type": "string",
-                    "description": "The content of the note"
-                },
-                "is_public": {
-                    "type": "boolean",
-                    "default": True,
-                    "description": "Whether the note should be public (visible to customer)"
-                },
-                "time_spent": {
-                    "type": "integer",
-                    "minimum": 0,
-                    "description": "Time spent in minutes (for time tracking)"
-                },
-                "billable": {
-                    "type": "boolean",
-                    "default": False,
-                    "description": "Whether the time spent is billable"
-                }
+    input_schema = MappingProxyType({
+        "type": "object",
+        "properties": {
+            "ticket_id": {
+                "type": "integer",
+                "description": "The ID of the ticket to add a note to"
             },
-            "required": ["ticket_id", "content"]
-        }
+            "content": {
+                "type": "string",
+                "description": "The content of the note"
+            },
+            "is_public": {
+                "type": "boolean",
+                "default": True,
+                "description": "Whether the note should be public (visible to customer)"
+            },
+            "time_spent": {
+                "type": "integer",
+                "minimum": 0,
+                "description": "Time spent in minutes (for time tracking)"
+            },
+            "billable": {
+                "type": "boolean",
+                "default": False,
+                "description": "Whether the time spent is billable"
+            }
+        },
+        "required": ["ticket_id", "content"]
+    })
 
     async def execute(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Execute add ticket note."""
         try:
             ticket_id = arguments["ticket_id"]
-            content = arguments["content"]
-            is_public = arguments.get("is_public", True)
-            time_spent = arguments.get("time_spent")
-            billable = arguments.get("billable", False)
 
-            # Prepare request data
+            # Prepare request data straight from the arguments; billing goes with time spent
             data = {
-                "content": content,
-                "isPublic": is_public
+                "content": arguments["content"],
+                "isPublic": arguments.get("is_public", True)
             }
 
-            if time_spent is not None:
+            if (time_spent := arguments.get("time_spent")) is not None:
                 data["timeSpent"] = time_spent
-                data["billable"] = billable
+                data["billable"] = arguments.get("billable", False)
 
             result = await self.client.post(f"/ticketing/tickets/{ticket_id}/notes", "add_ticket_note", data=data)
 
             return [TextContent(
                 type="text",
-                text=self.client._safe_json_stringify(result)
+                text=self._serialize(result)
             )]
 
         except Exception as e:
@@ -454,6 +490,7 @@ class TicketTools:
             GetMyTicketsTool(client),
             GetUnassignedTicketsTool(client),
             GetTicketDetailsTool(client),
+            BatchGetTicketDetailsTool(client),
             UpdateTicketStatusTool(client),
             AddTicketNoteTool(client)
         ]
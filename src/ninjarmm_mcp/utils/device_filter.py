@@ -1,74 +1,98 @@
 """Device filter builder utility for NinjaRMM API."""
 
+import functools
 import urllib.parse
-from typing import List, Optional, Union, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Sequence, Tuple, Union, Dict, Any
+from datetime import date
 import re
 
+from .ids import join_ids
+
+
+# Valid device classes as per NinjaRMM documentation, in documentation order
+DEVICE_CLASSES = (
+    "WINDOWS_SERVER",
+    "WINDOWS_WORKSTATION",
+    "LINUX_WORKSTATION",
+    "MAC",
+    "VMWARE_VM_HOST",
+    "VMWARE_VM_GUEST",
+    "LINUX_SERVER",
+    "MAC_SERVER",
+    "CLOUD_MONITOR_TARGET",
+    "NMS_SWITCH",
+    "NMS_ROUTER",
+    "NMS_FIREWALL",
+    "NMS_PRIVATE_NETWORK_GATEWAY",
+    "NMS_PRINTER",
+    "NMS_SCANNER",
+    "NMS_DIAL_MANAGER",
+    "NMS_WAP",
+    "NMS_IPSLA",
+    "NMS_COMPUTER",
+    "NMS_VM_HOST",
+    "NMS_APPLIANCE",
+    "NMS_OTHER",
+    "NMS_SERVER",
+    "NMS_PHONE",
+    "NMS_VIRTUAL_MACHINE",
+    "NMS_NETWORK_MANAGEMENT_AGENT",
+)
+
+def _as_tuple(values: Union[int, str, Sequence[Any]]) -> Tuple[Any, ...]:
+    """Normalize a single value or a sequence of values to a tuple (tuples pass through)."""
+    return (values,) if isinstance(values, (int, str)) else tuple(values)
+
+
+# Exactly YYYY-MM-DD; date.fromisoformat() alone also takes other ISO forms on newer Pythons
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
 
 class DeviceFilterBuilder:
     """Utility class to build NinjaRMM device filter strings from individual parameters."""
     
-    # Valid device classes as per NinjaRMM documentation
-    VALID_DEVICE_CLASSES = {
-        "WINDOWS_SERVER",
-        "WINDOWS_WORKSTATION", 
-        "LINUX_WORKSTATION",
-        "MAC",
-        "VMWARE_VM_HOST",
-        "VMWARE_VM_GUEST",
-        "LINUX_SERVER",
-        "MAC_SERVER",
-        "CLOUD_MONITOR_TARGET",
-        "NMS_SWITCH",
-        "NMS_ROUTER",
-        "NMS_FIREWALL",
-        "NMS_PRIVATE_NETWORK_GATEWAY",
-        "NMS_PRINTER",
-        "NMS_SCANNER",
-        "NMS_DIAL_MANAGER",
-        "NMS_WAP",
-        "NMS_IPSLA",
-        "NMS_COMPUTER",
-        "NMS_VM_HOST",
-        "NMS_APPLIANCE",
-        "NMS_OTHER",
-        "NMS_SERVER",
-        "NMS_PHONE",
-        "NMS_VIRTUAL_MACHINE",
-        "NMS_NETWORK_MANAGEMENT_AGENT"
-    }
+    VALID_DEVICE_CLASSES = frozenset(DEVICE_CLASSES)
+    
+    VALID_APPROVAL_STATUSES = frozenset({"PENDING", "APPROVED"})
+    VALID_ONLINE_STATUSES = frozenset({"online", "offline"})
+    
+    # Rendered once for the error messages
+    _VALID_CLASSES_STR = ", ".join(DEVICE_CLASSES)
+    _VALID_APPROVAL_STR = "PENDING, APPROVED"
+    _VALID_ONLINE_STR = "online, offline"
     
-    VALID_APPROVAL_STATUSES = {"PENDING", "APPROVED"}
-    VALID_ONLINE_STATUSES = {"online", "offline"}
+    # Status filter fragments built once and shared by every filter that uses them
+    _APPROVAL_FRAGMENTS = {status: f"status={status}" for status in ("PENDING", "APPROVED")}
+    _ONLINE_FRAGMENTS = {"online": "online", "offline": "offline"}
     
     def __init__(self):
         """Initialize the filter builder."""
         self.filters = []
     
-    def add_organization_filter(self, org_ids: Union[int, List[int]], exclude: bool = False) -> 'DeviceFilterBuilder':
-        """Add organization filter.
-        
-        Args:
-            org_ids: Single organization ID or list of organization IDs
-            exclude: If True, exclude these organizations (use != or nin)
-        """
-        if isinstance(org_ids, int):
-            org_ids = [org_ids]
-        
-        if not org_ids:
+    def _add_id_filter(self, field: str, ids: Union[int, List[int]], exclude: bool = False) -> 'DeviceFilterBuilder':
+        """Add an ID filter on field ("field=1", "field in (1,2)", or the != / nin forms)."""
+        ids = _as_tuple(ids)
+        if not ids:
             return self
             
-        if len(org_ids) == 1:
+        if len(ids) == 1:
             operator = "!=" if exclude else "="
-            self.filters.append(f"org{operator}{org_ids[0]}")
+            self.filters.append(f"{field}{operator}{ids[0]}")
         else:
             operator = "nin" if exclude else "in"
-            ids_str = ", ".join(map(str, org_ids))
-            self.filters.append(f"org {operator} ({ids_str})")
+            self.filters.append(f"{field} {operator} ({join_ids(ids)})")
         
         return self
     
+    def add_organization_filter(self, org_ids: Union[int, List[int]], exclude: bool = False) -> 'DeviceFilterBuilder':
+        """Add organization filter.
+        
+        Args:
+            org_ids: Single organization ID or list of organization IDs
+            exclude: If True, exclude these organizations (use != or nin)
+        """
+        return self._add_id_filter("org", org_ids, exclude)
+    
     def add_location_filter(self, loc_ids: Union[int, List[int]], exclude: bool = False) -> 'DeviceFilterBuilder':
         """Add location filter.
         
@@ -76,21 +100,7 @@ class DeviceFilterBuilder:
             loc_ids: Single location ID or list of location IDs
             exclude: If True, exclude these locations (use != or nin)
         """
-        if isinstance(loc_ids, int):
-            loc_ids = [loc_ids]
-        
-        if not loc_ids:
-            return self
-            
-        if len(loc_ids) == 1:
-            operator = "!=" if exclude else "="
-            self.filters.append(f"loc{operator}{loc_ids[0]}")
-        else:
-            operator = "nin" if exclude else "in"
-            ids_str = ", ".join(map(str, loc_ids))
-            self.filters.append(f"loc {operator} ({ids_str})")
-        
-        return self
+        return self._add_id_filter("loc", loc_ids, exclude)
     
     def add_role_filter(self, role_ids: Union[int, List[int]], exclude: bool = False) -> 'DeviceFilterBuilder':
         """Add device role filter.
@@ -99,21 +109,7 @@ class DeviceFilterBuilder:
             role_ids: Single role ID or list of role IDs
             exclude: If True, exclude these roles (use != or nin)
         """
-        if isinstance(role_ids, int):
-            role_ids = [role_ids]
-        
-        if not role_ids:
-            return self
-            
-        if len(role_ids) == 1:
-            operator = "!=" if exclude else "="
-            self.filters.append(f"role{operator}{role_ids[0]}")
-        else:
-            operator = "nin" if exclude else "in"
-            ids_str = ", ".join(map(str, role_ids))
-            self.filters.append(f"role {operator} ({ids_str})")
-        
-        return self
+        return self._add_id_filter("role", role_ids, exclude)
     
     def add_device_id_filter(self, device_ids: Union[int, List[int]]) -> 'DeviceFilterBuilder':
         """Add device ID filter.
@@ -121,19 +117,7 @@ class DeviceFilterBuilder:
         Args:
             device_ids: Single device ID or list of device IDs
         """
-        if isinstance(device_ids, int):
-            device_ids = [device_ids]
-        
-        if not device_ids:
-            return self
-            
-        if len(device_ids) == 1:
-            self.filters.append(f"id={device_ids[0]}")
-        else:
-            ids_str = ", ".join(map(str, device_ids))
-            self.filters.append(f"id in ({ids_str})")
-        
-        return self
+        return self._add_id_filter("id", device_ids)
     
     def add_device_class_filter(self, device_classes: Union[str, List[str]]) -> 'DeviceFilterBuilder':
         """Add device class filter.
@@ -141,23 +125,25 @@ class DeviceFilterBuilder:
         Args:
             device_classes: Single device class or list of device classes
         """
-        if isinstance(device_classes, str):
-            device_classes = [device_classes]
-        
+        device_classes = _as_tuple(device_classes)
         if not device_classes:
             return self
         
-        # Validate device classes
-        invalid_classes = set(device_classes) - self.VALID_DEVICE_CLASSES
-        if invalid_classes:
-            raise ValueError(f"Invalid device classes: {invalid_classes}. Valid classes: {self.VALID_DEVICE_CLASSES}")
-        
+        # A single class (the common case) is checked directly
         if len(device_classes) == 1:
-            self.filters.append(f"class={device_classes[0]}")
-        else:
-            classes_str = ", ".join(device_classes)
-            self.filters.append(f"class in ({classes_str})")
+            device_class = device_classes[0]
+            if device_class not in self.VALID_DEVICE_CLASSES:
+                raise ValueError(f"Invalid device classes: {[device_class]}. Valid classes: {self._VALID_CLASSES_STR}")
+            self.filters.append(f"class={device_class}")
+            return self
+        
+        # Otherwise one pass collects the invalid classes, in the order given
+        invalid_classes = [c for c in device_classes if c not in self.VALID_DEVICE_CLASSES]
+        if invalid_classes:
+            raise ValueError(f"Invalid device classes: {invalid_classes}. Valid classes: {self._VALID_CLASSES_STR}")
         
+        classes_str = ",".join(device_classes)
+        self.filters.append(f"class in ({classes_str})")
         return self
     
     def add_approval_status_filter(self, status: str) -> 'DeviceFilterBuilder':
@@ -166,10 +152,11 @@ class DeviceFilterBuilder:
         Args:
             status: Approval status ('PENDING' or 'APPROVED')
         """
-        if status not in self.VALID_APPROVAL_STATUSES:
-            raise ValueError(f"Invalid approval status: {status}. Valid statuses: {self.VALID_APPROVAL_STATUSES}")
+        fragment = self._APPROVAL_FRAGMENTS.get(status)
+        if fragment is None:
+            raise ValueError(f"Invalid approval status: {status}. Valid statuses: {self._VALID_APPROVAL_STR}")
         
-        self.filters.append(f"status={status}")
+        self.filters.append(fragment)
         return self
     
     def add_online_status_filter(self, status: str) -> 'DeviceFilterBuilder':
@@ -178,10 +165,11 @@ class DeviceFilterBuilder:
         Args:
             status: Online status ('online' or 'offline')
         """
-        if status not in self.VALID_ONLINE_STATUSES:
-            raise ValueError(f"Invalid online status: {status}. Valid statuses: {self.VALID_ONLINE_STATUSES}")
+        fragment = self._ONLINE_FRAGMENTS.get(status)
+        if fragment is None:
+            raise ValueError(f"Invalid online status: {status}. Valid statuses: {self._VALID_ONLINE_STR}")
         
-        self.filters.append(status)
+        self.filters.append(fragment)
         return self
     
     def add_creation_date_filter(self, after: Optional[str] = None, before: Optional[str] = None) -> 'DeviceFilterBuilder':
@@ -209,9 +197,7 @@ class DeviceFilterBuilder:
         Args:
             group_ids: Single group ID or list of group IDs
         """
-        if isinstance(group_ids, int):
-            group_ids = [group_ids]
-        
+        group_ids = _as_tuple(group_ids)
         if not group_ids:
             return self
         
@@ -228,6 +214,9 @@ class DeviceFilterBuilder:
         """
         if not self.filters:
             return ""
+        if len(self.filters) == 1:
+            # A lone fragment (often a shared status constant) is the filter itself
+            return self.filters[0]
 
         # Join filters with AND operator
         filter_string = " AND ".join(self.filters)
@@ -250,8 +239,11 @@ class DeviceFilterBuilder:
         Returns:
             True if valid, False otherwise
         """
+        if not isinstance(date_str, str) or not _DATE_PATTERN.fullmatch(date_str):
+            return False
         try:
-            datetime.strptime(date_str, "%Y-%m-%d")
+            # Checks the calendar (month/day ranges) without strptime's format parsing
+            date.fromisoformat(date_str)
             return True
         except ValueError:
             return False
@@ -312,3 +304,25 @@ class DeviceFilterBuilder:
             builder.add_group_filter(kwargs["group_ids"])
         
         return builder.build()
+
+
+@functools.lru_cache(maxsize=256)
+def _build_filter(items: Tuple[Tuple[str, Any], ...]) -> str:
+    return DeviceFilterBuilder.from_parameters(**dict(items))
+
+
+def build_filter(**kwargs) -> str:
+    """Build a filter string like DeviceFilterBuilder.from_parameters(), caching repeated filters.
+    
+    List values are frozen to tuples to form the cache key; the builder accepts either.
+    Unset (falsy) values are left out of the key, since the builder ignores them anyway,
+    so calls that differ only in unset arguments share one entry.
+    """
+    try:
+        return _build_filter(tuple(sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in kwargs.items() if value
+        )))
+    except TypeError:
+        # Unhashable values (e.g. nested objects) can't be cached
+        return DeviceFilterBuilder.from_parameters(**kwargs)
@@ -0,0 +1,10 @@
+"""Helpers for passing ID lists to the NinjaRMM API."""
+
+from typing import Any, Iterable
+
+
+def join_ids(values: Iterable[Any]) -> str:
+    """Join IDs or type names into the comma-separated form the API expects."""
+    # No spaces after the commas, since the list is URL-encoded into every request. A list
+    # of f-strings joins faster than map(str, ...) for the short int lists seen here
+    return ",".join([f"{value}" for value in values])
@@ -0,0 +1,48 @@
+"""JSON serialization helpers with optional orjson acceleration."""
+
+import functools
+import json
+import os
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup (pip install ninjamcp-python[fast])
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def dump_bytes(obj: Any, indent: bool = False,
+               default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Serialize an object to UTF-8 JSON bytes, using orjson when it is installed.
+
+    Args:
+        obj: JSON-compatible object to serialize
+        indent: If True, pretty-print with two-space indentation
+        default: Optional fallback converter for objects JSON cannot represent
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        # Non-string keys are stringified like json.dumps does instead of raising
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=default).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@functools.lru_cache(maxsize=None)
+def pretty_json() -> bool:
+    """Whether tool output should be indented (NINJARMM_PRETTY_JSON); compact by default.
+
+    Read on first use rather than at import so values loaded from .env by the server apply.
+    """
+    return os.getenv("NINJARMM_PRETTY_JSON", "").strip().lower() in ("1", "true", "yes")
@@ -0,0 +1,83 @@
+"""Tests for token single-flight, background refresh and coalesced token writes."""
+
+import asyncio
+
+import pytest
+
+from ninjarmm_mcp.auth import AuthenticationManager
+from ninjarmm_mcp.auth.tokens import TokenManager
+
+
+class TokenEndpoint:
+    """Stands in for the client-credentials grant and counts round trips."""
+
+    def __init__(self, delay: float = 0.05):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self, scope):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"access_token": f"tok{self.calls}", "expires_in": 3600}
+
+
+@pytest.fixture
+async def manager(tmp_path, monkeypatch):
+    auth = AuthenticationManager(
+        "https://example.invalid", "id", "secret",
+        token_storage_path=str(tmp_path / "tokens.json"),
+    )
+    await auth.initialize()
+    auth.token_endpoint = TokenEndpoint()
+    monkeypatch.setattr(auth.oauth_client, "get_client_credentials_token", auth.token_endpoint)
+    yield auth
+    await auth.close()
+
+
+async def test_concurrent_authenticate_makes_one_round_trip(manager):
+    tokens = await asyncio.gather(*[manager.authenticate("get_devices") for _ in range(10)])
+
+    assert set(tokens) == {"tok1"}
+    assert manager.token_endpoint.calls == 1
+    # Later calls are served from the cached token
+    assert await manager.authenticate("get_devices") == "tok1"
+    assert manager.token_endpoint.calls == 1
+
+
+async def test_stale_token_starts_one_background_refresh(manager):
+    # 200s token is stored at 90% (180s), inside the stale buffer but not expired
+    await manager.inject_client_token("old", expires_in=200)
+
+    tokens = await asyncio.gather(*[manager.authenticate("get_devices") for _ in range(5)])
+    assert set(tokens) == {"old"}
+
+    await manager._bg_refresh_task
+    assert manager.token_endpoint.calls == 1
+    assert await manager.authenticate("get_devices") == "tok1"
+
+
+async def test_set_token_burst_writes_once(tmp_path, monkeypatch):
+    tokens = TokenManager(str(tmp_path / "tokens.json"))
+    writes = []
+    write_sync = tokens._write_sync
+
+    def counting_write(content):
+        writes.append(content)
+        write_sync(content)
+
+    monkeypatch.setattr(tokens, "_write_sync", counting_write)
+
+    pending = [
+        asyncio.ensure_future(tokens.set_token("client", "a", 3600)),
+        asyncio.ensure_future(tokens.set_token("user", "b", 3600)),
+        asyncio.ensure_future(tokens.set_token("client", "c", 3600)),
+    ]
+    await asyncio.sleep(0)
+    await tokens.flush()
+
+    assert len(writes) == 1
+    reloaded = TokenManager(str(tmp_path / "tokens.json"))
+    await reloaded.load_tokens()
+    assert reloaded.get_token("client").access_token == "c"
+    assert reloaded.get_token("user").access_token == "b"
+    await asyncio.gather(*pending)
@@ -0,0 +1,33 @@
+"""Tests for argument validation shared by every tool."""
+
+from ninjarmm_mcp.tools.base import MAX_ID_LIST
+from ninjarmm_mcp.tools.devices import GetDevicesTool
+from ninjarmm_mcp.tools.tickets import MAX_TICKET_BATCH, BatchGetTicketDetailsTool
+
+
+class NoRequestsClient:
+    """Fails the test if a tool reaches the API."""
+
+    async def get(self, *args, **kwargs):
+        raise AssertionError("oversized arguments reached the API")
+
+
+async def test_max_items_enforced_without_schema_validator(monkeypatch):
+    monkeypatch.setattr(GetDevicesTool, "_validate", None)
+    tool = GetDevicesTool(NoRequestsClient())
+
+    result = await tool.execute({"device_ids": list(range(MAX_ID_LIST + 1))})
+
+    assert result[0].text == (
+        f"Invalid arguments for get_devices: device_ids must contain at most {MAX_ID_LIST} items"
+    )
+
+
+async def test_max_items_limit_comes_from_each_tools_schema(monkeypatch):
+    monkeypatch.setattr(BatchGetTicketDetailsTool, "_validate", None)
+    tool = BatchGetTicketDetailsTool(NoRequestsClient())
+
+    result = await tool.execute({"ticket_ids": list(range(MAX_TICKET_BATCH + 1))})
+
+    assert "ticket_ids must contain at most" in result[0].text
+    assert str(MAX_TICKET_BATCH) in result[0].text
@@ -0,0 +1,80 @@
+"""Tests for GET request coalescing in the API client."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from ninjarmm_mcp.auth import AuthenticationManager
+from ninjarmm_mcp.client import NinjaRMMAPIError, NinjaRMMClient
+
+
+@pytest.fixture
+async def api(tmp_path):
+    """Client wired to a mock transport; yields the client and the list of requests seen."""
+    requests = []
+
+    async def handler(request):
+        requests.append((request.method, request.url.path))
+        await asyncio.sleep(0.05)
+        if request.url.path.endswith("/fail"):
+            return httpx.Response(404, json={"error": "not found"})
+        return httpx.Response(200, json={"n": len(requests), "items": [1]})
+
+    auth = AuthenticationManager(
+        "https://example.invalid", "id", "secret", auth_mode="user",
+        token_storage_path=str(tmp_path / "tokens.json"), has_machine_credentials=False,
+    )
+    await auth.initialize()
+    await auth.inject_tokens_from_dict({"user": {"access_token": "token"}})
+    client = NinjaRMMClient(auth)
+    client._http._transport = httpx.MockTransport(handler)
+    yield client, requests
+    await client.aclose()
+    await auth.close()
+
+
+async def test_identical_concurrent_gets_share_one_request(api):
+    client, requests = api
+    results = await asyncio.gather(*[client.get("/devices", "op", {"x": 1}) for _ in range(5)])
+
+    assert len(requests) == 1
+    assert all(result == results[0] for result in results)
+
+
+async def test_joined_callers_get_independent_copies(api):
+    client, _ = api
+    results = await asyncio.gather(*[client.get("/devices", "op") for _ in range(3)])
+
+    assert len({id(result) for result in results}) == 3
+    results[0]["items"].append(99)
+    assert results[1]["items"] == [1]
+    assert results[2]["items"] == [1]
+
+
+async def test_post_clears_inflight(api):
+    client, requests = api
+    pending = asyncio.ensure_future(client.get("/devices", "op"))
+    await asyncio.sleep(0.01)
+    assert client._inflight
+
+    await client.post("/devices/1/reboot", "op", data={})
+    assert not client._inflight
+    await pending
+
+    # The GET issued before the write is not reused afterwards
+    await client.get("/devices", "op")
+    assert [method for method, _ in requests] == ["GET", "POST", "GET"]
+
+
+async def test_failed_request_is_not_reused(api):
+    client, requests = api
+    results = await asyncio.gather(*[client.get("/fail", "op") for _ in range(3)], return_exceptions=True)
+
+    assert len(requests) == 1
+    assert all(isinstance(result, NinjaRMMAPIError) for result in results)
+    assert not client._inflight
+
+    with pytest.raises(NinjaRMMAPIError):
+        await client.get("/fail", "op")
+    assert len(requests) == 2
@@ -0,0 +1,102 @@
+"""Tests for paged device counting and the per-organization count report."""
+
+import json
+from collections import Counter
+
+import pytest
+
+from ninjarmm_mcp.tools import counts
+from ninjarmm_mcp.tools.counts import GetDeviceCountByOrganizationTool, count_devices
+
+
+class FakeClient:
+    """Serves /devices pages from a handler and records the query parameters of each call."""
+
+    def __init__(self, handler, organizations=()):
+        self.handler = handler
+        self.organizations = list(organizations)
+        self.calls = []
+
+    async def get(self, endpoint, operation, params=None):
+        self.calls.append(dict(params or {}))
+        return self.handler(params or {})
+
+    async def get_organizations(self, refresh=False):
+        return self.organizations
+
+
+def paged(devices, page_size):
+    """Handler paging through devices by ID, honouring pageSize and after."""
+    def handler(params):
+        after = params.get("after", 0)
+        remaining = [device for device in devices if device["id"] > after]
+        return remaining[:params.get("pageSize", page_size)]
+    return handler
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    monkeypatch.setattr(counts, "COUNT_PAGE_SIZE", 2)
+
+
+async def test_count_devices_pages_through_listing():
+    devices = [{"id": i, "organizationId": 1 if i <= 3 else 2} for i in range(1, 6)]
+    client = FakeClient(paged(devices, 2))
+    tally = Counter()
+
+    total, pages, has_more = await count_devices(client, {"df": "class=MAC"}, "op", tally)
+
+    assert (total, pages, has_more) == (5, 3, False)
+    assert tally == Counter({1: 3, 2: 2})
+    assert [call.get("after") for call in client.calls] == [None, 2, 4]
+    assert all(call["df"] == "class=MAC" for call in client.calls)
+
+
+async def test_count_devices_stops_when_after_is_ignored():
+    client = FakeClient(lambda params: [{"id": 1}, {"id": 2}])
+
+    total, pages, has_more = await count_devices(client, {}, "op")
+
+    assert (total, pages, has_more) == (2, 1, True)
+    assert len(client.calls) == 2
+
+
+async def test_failed_batch_falls_back_to_per_org_counts():
+    organizations = [{"id": 1, "name": "One"}, {"id": 2, "name": "Two"}]
+
+    def handler(params):
+        df = params["df"]
+        if df.startswith("org in"):
+            raise RuntimeError("batch listing failed")
+        if df == "org=2":
+            raise RuntimeError("org 2 failed")
+        return [{"id": 10, "organizationId": 1}]
+
+    tool = GetDeviceCountByOrganizationTool(FakeClient(handler, organizations))
+    report = json.loads((await tool.execute({}))[0].text)
+
+    assert report["total_devices"] == 1
+    assert report["organizations_failed"] == 1
+    by_id = {org["organization_id"]: org for org in report["organizations"]}
+    assert by_id[1]["device_count"] == 1
+    assert by_id[2]["device_count"] is None
+    assert by_id[2]["error"] == "org 2 failed"
+    assert report["organizations"][-1]["organization_id"] == 2
+
+
+async def test_truncated_batch_is_recounted_per_org(monkeypatch):
+    monkeypatch.setattr(counts, "MAX_COUNT_PAGES", 1)
+    organizations = [{"id": 1, "name": "One"}, {"id": 2, "name": "Two"}]
+    devices = {
+        "org in (1,2)": [{"id": 10, "organizationId": 1}, {"id": 11, "organizationId": 1}],
+        "org=1": [{"id": 10, "organizationId": 1}, {"id": 11, "organizationId": 1}],
+        "org=2": [{"id": 20, "organizationId": 2}],
+    }
+
+    tool = GetDeviceCountByOrganizationTool(FakeClient(lambda params: devices[params["df"]], organizations))
+    report = json.loads((await tool.execute({}))[0].text)
+
+    by_id = {org["organization_id"]: org for org in report["organizations"]}
+    assert (by_id[1]["device_count"], by_id[1]["has_more"]) == (2, True)
+    assert (by_id[2]["device_count"], by_id[2]["has_more"]) == (1, False)
+    assert report["total_devices"] == 3
@@ -0,0 +1,67 @@
+"""Tests for the one-shot OAuth2 redirect callback listener."""
+
+import asyncio
+
+import pytest
+
+from ninjarmm_mcp.auth.oauth import OAuth2CallbackListener
+
+
+@pytest.fixture
+async def listener():
+    """Listener served on an ephemeral localhost port; yields (listener, port)."""
+    callback = OAuth2CallbackListener()
+    server = await asyncio.start_server(callback.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    yield callback, port
+    server.close()
+    await server.wait_closed()
+
+
+async def send(port: int, path: str) -> bytes:
+    """Send one raw HTTP request and return the full response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+async def test_code_callback_resolves_with_code(listener):
+    callback, port = listener
+    response = await send(port, "/callback?code=abc123&state=xyz")
+
+    assert response.startswith(b"HTTP/1.1 200 OK")
+    assert await callback.result == "abc123"
+
+
+async def test_error_callback_fails_the_flow(listener):
+    callback, port = listener
+    response = await send(port, "/callback?error=access_denied")
+
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"access_denied" in response
+    with pytest.raises(Exception, match="Authorization failed: access_denied"):
+        await callback.result
+
+
+async def test_stray_request_does_not_end_the_flow(listener):
+    callback, port = listener
+    response = await send(port, "/favicon.ico")
+
+    assert response.startswith(b"HTTP/1.1 404 Not Found")
+    assert not callback.result.done()
+
+    await send(port, "/callback?code=abc123")
+    assert await callback.result == "abc123"
+
+
+async def test_second_callback_after_resolution_is_ignored(listener):
+    callback, port = listener
+    await send(port, "/callback?code=first")
+    response = await send(port, "/callback?code=second")
+
+    assert response.startswith(b"HTTP/1.1 404 Not Found")
+    assert await callback.result == "first"